@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+# Claims added to tokens by GameTokenObtainPairSerializer
+ACTIVE_CLAIM = 'active'
+STAFF_CLAIM = 'staff'
+ROLE_CLAIM = 'role'
+
+DEFAULT_STATE_TTL = 30
+DEFAULT_STATE_CACHE_SIZE = 10000
+
+
+class UserStateCache:
+    """
+    Small in-process LRU cache of the fields that decide whether a user's tokens are still
+    accepted (active flag, revocation hash of the password, staff flag and role).
+
+    Entries expire after ttl seconds, so a deactivation or password change made in another
+    process takes effect within ttl; changes saved in this process evict the entry at once.
+    """
+
+    def __init__(self, ttl=DEFAULT_STATE_TTL, max_size=DEFAULT_STATE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        state = (
+            User.objects.filter(pk=user_id)
+            .values('is_active', 'is_staff', 'role_id', 'password')
+            .first()
+        )
+        if state is not None:
+            state['revoke_hash'] = get_md5_hash_password(state.pop('password'))
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, state)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return state
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_states = UserStateCache(
+    ttl=getattr(settings, 'AUTH_USER_STATE_TTL', DEFAULT_STATE_TTL),
+    max_size=getattr(settings, 'AUTH_USER_STATE_CACHE_SIZE', DEFAULT_STATE_CACHE_SIZE),
+)
+
+
+class LazyUser:
+    """
+    Authenticated user built from token claims. id, is_active, is_staff and role_id are
+    known without a query; any other field or method loads the User row on first access.
+    Attributes set on it (e.g. balance after a wallet operation) are kept without a query.
+
+    It is not a User instance: pass user.pk to ORM filters and foreign keys.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, is_active=True, is_staff=False, role_id=None):
+        self.__dict__.update(pk=user_id, id=user_id, is_active=is_active, is_staff=is_staff, role_id=role_id)
+
+    def _get_user(self):
+        user = self.__dict__.get('_user')
+        if user is None:
+            user = User.objects.get(pk=self.pk)
+            # values already set on the lazy user win over the loaded row
+            for name, value in self.__dict__.items():
+                if name not in ('pk', 'id', '_user'):
+                    setattr(user, name, value)
+            self.__dict__['_user'] = user
+        return user
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._get_user(), name)
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = value
+        if '_user' in self.__dict__:
+            setattr(self.__dict__['_user'], name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, (LazyUser, User)) and other.pk == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return f"User {self.pk}"
+
+
+class GameTokenAuthentication(JWTAuthentication):
+    """
+    JWT authentication for the game endpoints that does not load the User row per request.
+
+    The signed token supplies the user id, active flag, staff flag and role; revocation
+    (deactivation, and a password change when SIMPLE_JWT CHECK_REVOKE_TOKEN is on) is checked
+    against UserStateCache, which queries the database at most once per user per TTL.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if api_settings.USER_ID_FIELD not in ('id', 'pk'):
+            return super().get_user(validated_token)
+
+        state = user_states.get(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not validated_token.get(ACTIVE_CLAIM, True) or not state['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != state['revoke_hash']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return LazyUser(
+            user_id,
+            is_active=True,
+            is_staff=validated_token.get(STAFF_CLAIM, state['is_staff']),
+            role_id=validated_token.get(ROLE_CLAIM, state['role_id']),
+        )
@@ -104,7 +104,14 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     balance_after = models.DecimalField(max_digits=10, decimal_places=2)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # set when the object is built, not when it is inserted (history rows may be written behind)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # history pages: WHERE user = ? AND (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+            models.Index(fields=['user', 'created_at', 'id'], name='transaction_user_time_idx'),
+        ]
 
     def __str__(self):
         return f"Transaction {self.id} - {self.transaction_type} by {self.user}"
\ No newline at end of file
@@ -1,4 +1,6 @@
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer, UserSerializer as BaseUserSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .authentication import ACTIVE_CLAIM, ROLE_CLAIM, STAFF_CLAIM
 from .models import User
 
 class CustomUserCreateSerializer(BaseUserCreateSerializer):
@@ -11,3 +13,15 @@ class CustomUserSerializer(BaseUserSerializer):
     class Meta(BaseUserSerializer.Meta):
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'phone', 'age', 'balance')
+
+
+class GameTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the claims GameTokenAuthentication trusts instead of loading the user"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ACTIVE_CLAIM] = user.is_active
+        token[STAFF_CLAIM] = user.is_staff
+        token[ROLE_CLAIM] = user.role_id
+        return token
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_states
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user_state(sender, instance, **kwargs):
+    """Changes saved in this process apply to token checks at once; other processes wait for the TTL"""
+    user_states.evict(instance.pk)
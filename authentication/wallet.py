@@ -0,0 +1,134 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F
+
+from shared.django.write_behind import get_ledger
+
+from .models import Transaction, User
+
+# Backends that support UPDATE ... RETURNING (SQLite >= 3.35)
+RETURNING_VENDORS = ('postgresql', 'sqlite')
+
+
+class InsufficientFunds(Exception):
+    """Raised when a debit would take the balance below zero"""
+
+
+class InvalidAmount(ValueError):
+    """Raised when a deposit amount is not a money value the ledger can store"""
+
+
+def _balance_field():
+    return User._meta.get_field('balance')
+
+
+def _to_balance(value):
+    field = _balance_field()
+    return field.to_python(value).quantize(Decimal(10) ** -field.decimal_places)
+
+
+def _update_balance(user_id, delta, minimum=None):
+    """
+    Adds delta to the user's balance in a single statement and returns the new balance.
+    With minimum set, the row is only updated while balance >= minimum; returns None otherwise.
+    """
+    if connection.vendor in RETURNING_VENDORS:
+        qn = connection.ops.quote_name
+        balance = qn(_balance_field().column)
+        sql = f"UPDATE {qn(User._meta.db_table)} SET {balance} = {balance} + %s WHERE {qn(User._meta.pk.column)} = %s"
+        params = [delta, user_id]
+        if minimum is not None:
+            sql += f" AND {balance} >= %s"
+            params.append(minimum)
+        with connection.cursor() as cursor:
+            cursor.execute(sql + f" RETURNING {balance}", params)
+            row = cursor.fetchone()
+        return None if row is None else _to_balance(row[0])
+
+    users = User.objects.filter(pk=user_id)
+    if minimum is not None:
+        users = users.filter(balance__gte=minimum)
+    if not users.update(balance=F('balance') + delta):
+        return None
+    # the row stays locked by the UPDATE until the transaction ends
+    return User.objects.values_list('balance', flat=True).get(pk=user_id)
+
+
+def _record(user, transaction_type, amount, balance):
+    """
+    Writes the ledger row; with the write-behind ledger enabled it is queued after commit instead.
+    """
+    entry = Transaction(user_id=user.pk, transaction_type=transaction_type, amount=amount, balance_after=balance)
+    ledger = get_ledger()
+    if ledger is None:
+        entry.save(force_insert=True)
+    else:
+        ledger.add_on_commit(entry)
+    return entry
+
+
+def debit(user, amount, transaction_type='BET'):
+    """
+    Takes amount from the user's balance and writes (or queues) the ledger row in one transaction.
+    Funds are checked by the database (UPDATE ... WHERE balance >= amount), so concurrent
+    debits of one account can never overdraw it. Raises InsufficientFunds.
+    """
+    if amount <= 0:
+        raise ValueError("Debit amount must be positive")
+
+    # no savepoint: a failed ledger insert must roll back the enclosing transaction as well
+    with transaction.atomic(savepoint=False):
+        balance = _update_balance(user.pk, -amount, minimum=amount)
+        if balance is not None:
+            entry = _record(user, transaction_type, amount, balance)
+    if balance is None:
+        raise InsufficientFunds("Insufficient funds")
+
+    user.balance = balance
+    return entry
+
+
+def parse_deposit_amount(value):
+    """
+    Converts a deposit amount from a request body to Decimal. Raises InvalidAmount unless it is
+    finite, positive and valid for Transaction.amount (max_digits, at most two decimal places).
+    """
+    if isinstance(value, bool):
+        raise InvalidAmount("Invalid amount format")
+    if isinstance(value, float):
+        # JSON numbers parsed as float: 0.1 becomes Decimal('0.1'), not its binary expansion
+        value = repr(value)
+    try:
+        amount = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation) as exc:
+        raise InvalidAmount("Invalid amount format") from exc
+    if not amount.is_finite():
+        raise InvalidAmount("Invalid amount format")
+    try:
+        for validator in Transaction._meta.get_field('amount').validators:
+            validator(amount)
+    except ValidationError as exc:
+        raise InvalidAmount("Invalid amount format") from exc
+    if amount <= 0:
+        raise InvalidAmount("Deposit amount must be greater than zero")
+    return amount
+
+
+def credit(user, amount, transaction_type='WIN'):
+    """
+    Adds amount to the user's balance and writes the ledger row in one transaction.
+    """
+    if amount <= 0:
+        raise ValueError("Credit amount must be positive")
+
+    with transaction.atomic(savepoint=False):
+        balance = _update_balance(user.pk, amount)
+        if balance is not None:
+            entry = _record(user, transaction_type, amount, balance)
+    if balance is None:
+        raise User.DoesNotExist("User matching query does not exist.")
+
+    user.balance = balance
+    return entry
@@ -116,6 +116,15 @@ REST_FRAMEWORK = {
     ),
 }
 
+SIMPLE_JWT = {
+    # adds the active/staff/role claims used by GameTokenAuthentication
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.serializers.GameTokenObtainPairSerializer',
+}
+
+# Game endpoints trust token claims; user state for revocation is re-read at most once per TTL (seconds)
+AUTH_USER_STATE_TTL = 30
+AUTH_USER_STATE_CACHE_SIZE = 10000
+
 # DJOSER Configuration
 DJOSER = {
     'USER_ID_FIELD': 'id',
@@ -144,3 +153,47 @@ STATIC_URL = 'static/'
 # Default primary key field type
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# RTP reports
+
+RTP_REPORT_AUTO_SCHEDULE = True
+RTP_REPORT_TOTAL_SPINS = 1000000
+RTP_REPORT_WORKERS = 1
+RTP_REPORT_SEED = None
+# A RUNNING report not updated for this many seconds (crashed worker) is queued again
+RTP_REPORT_RUNNING_TIMEOUT = 60 * 60
+
+# Compiled slot machines: each process re-reads SlotMachine.config_version at most this often
+# (seconds), so configuration changes reach every worker within this delay
+COMPILED_MACHINE_VERSION_TTL = 1.0
+
+# Write-behind ledger: Spin and Transaction history rows are inserted in the background
+# (balance changes stay synchronous). Backpressure when the queue is full: 'block' or 'sync'.
+# A batch that fails LEDGER_MAX_ATTEMPTS times is split to isolate bad rows, which are written
+# to the 'shared.django.write_behind.dead_letter' log and dropped.
+
+LEDGER_WRITE_BEHIND = False
+LEDGER_FLUSH_ROWS = 500
+LEDGER_FLUSH_INTERVAL_MS = 200
+LEDGER_QUEUE_SIZE = 10000
+LEDGER_BACKPRESSURE = 'block'
+LEDGER_MAX_ATTEMPTS = 3
+
+# Async endpoints (/slot/async/...): size of the thread pool that runs their database calls,
+# i.e. concurrent requests and database connections per ASGI worker process
+
+ASYNC_DB_THREADS = int(os.getenv("ASYNC_DB_THREADS", default="10"))
+
+# Game sessions: an open session per (user, machine, bet, lines) is reused by spins
+# and closed after this many seconds without a spin
+
+GAME_SESSION_IDLE_TIMEOUT = 30 * 60
+
+# Hourly play statistics (update_hourly_stats): spins younger than this many seconds
+# are left for the next run, so rows committed out of id order are not skipped
+
+ROLLUP_SETTLE_SECONDS = 5
+
+# History archive: Spin and Transaction rows moved out of the hot tables by archive_history
+
+ARCHIVE_ROOT = BASE_DIR / 'archive'
@@ -0,0 +1,44 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ASYNC_DB_THREADS', 10),
+                    thread_name_prefix='async-db',
+                )
+    return _executor
+
+
+def _call_with_connection(func, args, kwargs):
+    # Each pool thread owns its own connection; recycle it like a request would (CONN_MAX_AGE, errors)
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """
+    Runs a blocking database function (ORM queries, transaction.atomic blocks) on a bounded
+    pool of ASYNC_DB_THREADS threads and awaits its result without blocking the event loop.
+
+    Unlike sync_to_async(thread_sensitive=True), which the async ORM uses and which funnels every
+    query of the process through one thread, calls run in parallel on up to ASYNC_DB_THREADS
+    connections. The pool size is therefore also the per-process connection limit.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(_call_with_connection, func, args, kwargs))
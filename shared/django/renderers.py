@@ -0,0 +1,79 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+COMPACT_MEDIA_TYPE = 'application/vnd.slotgame.compact+json'
+
+# One preconfigured encoder with JSONRenderer's defaults (UNICODE_JSON, COMPACT_JSON, STRICT_JSON);
+# its default() also renders the types orjson lacks (Decimal as a number, lazy strings, querysets)
+_stdlib_encoder = encoders.JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+_default = _stdlib_encoder.default
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(data):
+        """
+        JSON bytes equivalent to DRF's JSONRenderer output: compact separators, Decimals as
+        numbers, UTC datetimes with 'Z', U+2028/U+2029 escaped.
+        """
+        content = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+else:
+    def dumps(data):
+        """
+        JSON bytes equivalent to DRF's JSONRenderer output: compact separators, Decimals as
+        numbers, UTC datetimes with 'Z', U+2028/U+2029 escaped.
+        """
+        content = _stdlib_encoder.encode(data)
+        return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def to_compact(data):
+    """
+    Compact form of a response: every object becomes the array of its values in key order,
+    so clients index fields by position instead of receiving key names with every response.
+
+    Objects are converted as values of objects and as items of arrays of objects; arrays of
+    anything else (grids, line numbers, per-spin result arrays) are passed through uncopied.
+    """
+    if isinstance(data, dict):
+        return [to_compact(value) for value in data.values()]
+    if isinstance(data, (list, tuple)) and data and isinstance(data[0], dict):
+        return [to_compact(value) for value in data]
+    return data
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer for hot endpoints. Output is equivalent to JSONRenderer's, but
+    without per-response encoder setup and media type parsing (indent is not supported);
+    uses orjson when it is installed.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class CompactJSONRenderer(FastJSONRenderer):
+    """
+    Array-based format selected with "Accept: application/vnd.slotgame.compact+json": objects
+    are rendered as arrays of their values (see to_compact). Error responses keep the object form.
+    """
+    media_type = COMPACT_MEDIA_TYPE
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.status_code >= 400:
+            return super().render(data, accepted_media_type, renderer_context)
+        return super().render(to_compact(data), accepted_media_type, renderer_context)
@@ -0,0 +1,217 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+# One record per dropped row, with its model and field values, for manual replay
+dead_letter_logger = logging.getLogger(__name__ + '.dead_letter')
+
+BACKPRESSURE_BLOCK = 'block'
+BACKPRESSURE_SYNC = 'sync'
+
+# How long a failed batch waits before the next insert attempt
+RETRY_DELAY = 1.0
+
+# Failures of the database itself rather than of particular rows: a batch that fails with
+# these is kept and retried as a whole, never split or dropped
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+_STOP = object()
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+class WriteBehindLedger:
+    """
+    Bounded in-process queue of unsaved model instances (history rows) that a background
+    thread inserts with bulk_create every flush_rows rows or flush_interval seconds.
+
+    When the queue is full, the 'block' policy makes the caller wait for free space and the
+    'sync' policy inserts the row in the caller's thread. close() drains the queue and runs at
+    interpreter exit, so a graceful worker shutdown does not lose rows.
+
+    A batch that fails to insert is retried. After max_attempts failures it is split in halves
+    down to single rows, so one bad row (a deleted foreign key, an overflowing amount) does not
+    stop the ledger: rows that still fail alone go to the dead-letter log and are dropped, and
+    are counted in failed_rows. While the database is unreachable (TRANSIENT_ERRORS) nothing is
+    dropped and the batch is retried whole.
+    """
+
+    def __init__(self, flush_rows=500, flush_interval=0.2, queue_size=10000, backpressure=BACKPRESSURE_BLOCK,
+                 max_attempts=3):
+        if backpressure not in (BACKPRESSURE_BLOCK, BACKPRESSURE_SYNC):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.max_attempts = max_attempts
+        # Failed insert attempts and rows dropped to the dead-letter log since start
+        self.failed_batches = 0
+        self.failed_rows = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-behind-ledger', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def add(self, instance):
+        """Queues an unsaved model instance for insertion."""
+        if self._closed:
+            error = self._try_insert([instance])
+            if error is not None:
+                self._dead_letter(instance, error)
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(instance)
+        except queue.Full:
+            if self.backpressure != BACKPRESSURE_SYNC or not self._insert([instance]):
+                self._queue.put(instance)
+
+    def add_on_commit(self, instance):
+        """Queues the instance once the current transaction commits (dropped on rollback)."""
+        transaction.on_commit(lambda: self.add(instance))
+
+    def flush(self, timeout=None):
+        """Waits until every row queued so far is inserted; returns False on timeout."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self, timeout=30):
+        """Stops the background thread after it has inserted everything still queued."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        pending = []
+        attempts = 0
+        stopping = False
+        while not stopping:
+            deadline = time.monotonic() + self.flush_interval
+            batch = []
+            while len(pending) + len(batch) < self.flush_rows:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            pending += batch
+            if not pending:
+                continue
+
+            close_old_connections()
+            if self._insert(pending):
+                left = []
+            else:
+                attempts += 1
+                left = self._insert_isolating(pending) if stopping or attempts >= self.max_attempts else pending
+
+            if stopping and left:
+                logger.error("Write-behind ledger lost %s rows on shutdown", len(left))
+                for row in left:
+                    self._dead_letter(row, "database unavailable on shutdown")
+                left = []
+            for _ in range(len(pending) - len(left)):
+                self._queue.task_done()
+            if left:
+                pending = left
+                time.sleep(RETRY_DELAY)
+            else:
+                pending = []
+                attempts = 0
+        close_old_connections()
+
+    def _try_insert(self, rows):
+        """Inserts rows in one transaction; returns the exception if it failed, else None."""
+        models = {}
+        for row in rows:
+            models.setdefault(type(row), []).append(row)
+        unsaved = [row for row in rows if row.pk is None]
+        try:
+            with transaction.atomic():
+                for model, instances in models.items():
+                    model.objects.bulk_create(instances, batch_size=self.flush_rows)
+        except Exception as exc:
+            # ids returned by the rolled back insert must not be reused by the retry
+            for row in unsaved:
+                row.pk = None
+            return exc
+        return None
+
+    def _insert(self, rows):
+        error = self._try_insert(rows)
+        if error is not None:
+            self.failed_batches += 1
+            logger.error("Write-behind ledger failed to insert %s rows", len(rows), exc_info=error)
+            return False
+        return True
+
+    def _insert_isolating(self, rows):
+        """
+        Inserts rows, splitting a failing batch in halves down to single rows; a single row
+        that still fails is dead-lettered. Returns the rows left to retry because the database
+        itself failed (TRANSIENT_ERRORS).
+        """
+        error = self._try_insert(rows)
+        if error is None:
+            return []
+        if isinstance(error, TRANSIENT_ERRORS):
+            return rows
+        if len(rows) == 1:
+            self._dead_letter(rows[0], error)
+            return []
+        middle = len(rows) // 2
+        return self._insert_isolating(rows[:middle]) + self._insert_isolating(rows[middle:])
+
+    def _dead_letter(self, row, error):
+        with self._lock:
+            self.failed_rows += 1
+        values = {field.attname: getattr(row, field.attname) for field in row._meta.concrete_fields}
+        dead_letter_logger.error(
+            "Dropped %s row: %s (%s)", row._meta.label, json.dumps(values, default=str), error
+        )
+
+
+def get_ledger():
+    """
+    Returns the process-wide WriteBehindLedger, or None when LEDGER_WRITE_BEHIND is off.
+    """
+    global _ledger
+    if not getattr(settings, 'LEDGER_WRITE_BEHIND', False):
+        return None
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = WriteBehindLedger(
+                    flush_rows=getattr(settings, 'LEDGER_FLUSH_ROWS', 500),
+                    flush_interval=getattr(settings, 'LEDGER_FLUSH_INTERVAL_MS', 200) / 1000,
+                    queue_size=getattr(settings, 'LEDGER_QUEUE_SIZE', 10000),
+                    backpressure=getattr(settings, 'LEDGER_BACKPRESSURE', BACKPRESSURE_BLOCK),
+                    max_attempts=getattr(settings, 'LEDGER_MAX_ATTEMPTS', 3),
+                )
+    return _ledger
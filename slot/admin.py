@@ -1,8 +1,8 @@
 from django.contrib import admin
-from .models import SlotMachine, Symbol, GameSession, Spin, Payline
+from .models import SlotMachine, Symbol, GameSession, Spin, SymbolTable, Payline, ReelStrip, RTPReport, MachineHourlyStats, RollupWatermark
 
 class SlotMachineAdmin(admin.ModelAdmin):
-    list_display = ('name', 'rows', 'cols', 'max_lines', 'min_bet', 'max_bet', 'created_at', 'updated_at')
+    list_display = ('name', 'rows', 'cols', 'max_lines', 'evaluation_mode', 'use_lookup_table', 'min_bet', 'max_bet', 'created_at', 'updated_at')
     search_fields = ('name',)
     list_filter = ('created_at', 'updated_at')
     ordering = ('name',)
@@ -15,18 +15,25 @@ class SymbolAdmin(admin.ModelAdmin):
     ordering = ('slot_machine', 'symbol_name')
 
 class GameSessionAdmin(admin.ModelAdmin):
-    list_display = ('user', 'slot_machine', 'bet_amount', 'lines', 'total_winnings', 'session_start', 'session_end')
+    list_display = ('user', 'slot_machine', 'bet_amount', 'lines', 'spin_count', 'total_wagered', 'total_winnings', 'session_start', 'session_end')
     list_filter = ('session_start', 'session_end', 'slot_machine')
     search_fields = ('user__email', 'slot_machine__name')
     ordering = ('-session_start',)
-    readonly_fields = ('session_start', 'session_end')
+    readonly_fields = ('spin_count', 'total_wagered', 'total_winnings', 'session_start', 'last_activity', 'session_end')
 
 class SpinAdmin(admin.ModelAdmin):
-    list_display = ('game_session', 'spin_result', 'winnings', 'spin_time')
+    list_display = ('game_session', 'result', 'winnings', 'spin_time')
     list_filter = ('spin_time',)
     search_fields = ('game_session__user__email',)
     ordering = ('-spin_time',)
-    readonly_fields = ('spin_time',)
+    exclude = ('spin_result', 'grid', 'symbol_table')
+    readonly_fields = ('result', 'spin_time')
+
+class SymbolTableAdmin(admin.ModelAdmin):
+    list_display = ('slot_machine', 'rows', 'cols', 'symbols', 'created_at')
+    list_filter = ('slot_machine',)
+    ordering = ('slot_machine', 'id')
+    readonly_fields = ('slot_machine', 'digest', 'rows', 'cols', 'symbols', 'created_at')
 
 class PaylineAdmin(admin.ModelAdmin):
     list_display = ('slot_machine', 'line_number', 'coordinates')
@@ -34,9 +41,38 @@ class PaylineAdmin(admin.ModelAdmin):
     search_fields = ('slot_machine__name',)
     ordering = ('slot_machine', 'line_number')
 
+class ReelStripAdmin(admin.ModelAdmin):
+    list_display = ('slot_machine', 'reel_number', 'symbols')
+    list_filter = ('slot_machine',)
+    search_fields = ('slot_machine__name',)
+    ordering = ('slot_machine', 'reel_number')
+
+class RTPReportAdmin(admin.ModelAdmin):
+    list_display = ('slot_machine', 'status', 'rtp', 'volatility', 'total_spins', 'created_at', 'finished_at')
+    list_filter = ('status', 'slot_machine')
+    search_fields = ('slot_machine__name', 'config_fingerprint')
+    ordering = ('-created_at',)
+    readonly_fields = ('config_fingerprint', 'created_at', 'updated_at', 'finished_at')
+
+class MachineHourlyStatsAdmin(admin.ModelAdmin):
+    list_display = ('slot_machine', 'hour', 'spin_count', 'winning_spins', 'total_wagered', 'total_winnings', 'ggr')
+    list_filter = ('slot_machine',)
+    date_hierarchy = 'hour'
+    ordering = ('-hour', 'slot_machine')
+    readonly_fields = ('slot_machine', 'hour', 'spin_count', 'winning_spins', 'total_wagered', 'total_winnings')
+
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_spin_id', 'updated_at')
+    readonly_fields = ('updated_at',)
+
 
 admin.site.register(SlotMachine, SlotMachineAdmin)
 admin.site.register(Symbol, SymbolAdmin)
 admin.site.register(GameSession, GameSessionAdmin)
 admin.site.register(Spin, SpinAdmin)
+admin.site.register(SymbolTable, SymbolTableAdmin)
 admin.site.register(Payline, PaylineAdmin)
+admin.site.register(ReelStrip, ReelStripAdmin)
+admin.site.register(RTPReport, RTPReportAdmin)
+admin.site.register(MachineHourlyStats, MachineHourlyStatsAdmin)
+admin.site.register(RollupWatermark, RollupWatermarkAdmin)
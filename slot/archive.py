@@ -0,0 +1,232 @@
+import gzip
+import json
+import os
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from authentication.models import Transaction
+from .models import Spin
+from .rollups import rolled_up_spin_id
+
+KIND_TRANSACTIONS = 'transactions'
+KIND_SPINS = 'spins'
+KINDS = (KIND_TRANSACTIONS, KIND_SPINS)
+
+DEFAULT_BATCH_SIZE = 10000
+DELETE_BATCH_SIZE = 1000
+
+
+def get_archive_root():
+    """Каталог архива истории (settings.ARCHIVE_ROOT)."""
+    return Path(getattr(settings, 'ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'archive'))
+
+
+TRANSACTION_FIELDS = ('id', 'user_id', 'transaction_type', 'amount', 'balance_after', 'created_at')
+SPIN_FIELDS = ('id', 'spin_result', 'grid', 'symbol_table_id', 'winnings', 'spin_time',
+               'game_session__user_id', 'game_session__slot_machine_id', 'game_session__bet_amount',
+               'game_session__lines')
+
+
+def transaction_record(row):
+    """Строка истории транзакции из Transaction.values(*TRANSACTION_FIELDS)."""
+    return {
+        "id": row['id'],
+        "user_id": row['user_id'],
+        "time": row['created_at'],
+        "transaction_type": row['transaction_type'],
+        "amount": str(row['amount']),
+        "balance_after": str(row['balance_after']),
+    }
+
+
+def spin_record(spin):
+    """
+    Строка истории спина из Spin (select_related('game_session').only(*SPIN_FIELDS)).
+    Результат хранится раскодированным, чтобы строка читалась без таблиц символов.
+    """
+    return {
+        "id": spin.id,
+        "user_id": spin.game_session.user_id,
+        "time": spin.spin_time,
+        "game_session_id": spin.game_session_id,
+        "slot_machine_id": spin.game_session.slot_machine_id,
+        "bet_amount": str(spin.game_session.bet_amount),
+        "lines": spin.game_session.lines,
+        "result": spin.result,
+        "winnings": str(spin.winnings),
+    }
+
+
+def _transaction_rows(cutoff, after_id, limit):
+    rows = (
+        Transaction.objects.filter(created_at__lt=cutoff, id__gt=after_id)
+        .order_by('id')
+        .values(*TRANSACTION_FIELDS)[:limit]
+    )
+    return [transaction_record(row) for row in rows]
+
+
+def _spin_rows(cutoff, after_id, limit):
+    # спины, еще не учтенные в почасовых итогах, остаются в базе до следующего запуска
+    spins = (
+        Spin.objects.filter(spin_time__lt=cutoff, id__gt=after_id, id__lte=rolled_up_spin_id())
+        .select_related('game_session')
+        .only(*SPIN_FIELDS)
+        .order_by('id')[:limit]
+    )
+    return [spin_record(spin) for spin in spins]
+
+
+ROW_SOURCES = {
+    KIND_TRANSACTIONS: (Transaction, _transaction_rows),
+    KIND_SPINS: (Spin, _spin_rows),
+}
+
+
+def _write_segment(directory, rows):
+    """
+    Пишет один сегмент: по отдельному gzip-члену на пользователя (строки JSON в порядке id)
+    и маленький индекс со смещениями членов и диапазоном времени по каждому пользователю.
+    Файлы пишутся во временные и переименовываются, поэтому сегмент не бывает недописанным.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"segment-{rows[0]['id']:012d}-{rows[-1]['id']:012d}"
+    segment_path = directory / f"{name}.jsonl.gz"
+    index_path = directory / f"{name}.index.json"
+
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row['user_id'], []).append(row)
+
+    users = {}
+    temporary = segment_path.with_suffix('.tmp')
+    with open(temporary, 'wb') as segment:
+        for user_id, user_rows in by_user.items():
+            offset = segment.tell()
+            lines = ''.join(json.dumps({**row, "time": row['time'].isoformat()}) + '\n' for row in user_rows)
+            segment.write(gzip.compress(lines.encode()))
+            users[str(user_id)] = {
+                "offset": offset,
+                "length": segment.tell() - offset,
+                "rows": len(user_rows),
+                "first_time": min(row['time'] for row in user_rows).isoformat(),
+                "last_time": max(row['time'] for row in user_rows).isoformat(),
+            }
+        segment.flush()
+        os.fsync(segment.fileno())
+    os.replace(temporary, segment_path)
+
+    index = {
+        "segment": segment_path.name,
+        "rows": len(rows),
+        "first_id": rows[0]['id'],
+        "last_id": rows[-1]['id'],
+        "users": users,
+    }
+    temporary = index_path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(index))
+    os.replace(temporary, index_path)
+    return segment_path
+
+
+def archive_history(kind, cutoff, batch_size=DEFAULT_BATCH_SIZE, root=None):
+    """
+    Переносит строки истории (транзакции или спины) старше cutoff из базы в архив.
+
+    Строки читаются пачками по первичному ключу (keyset, без OFFSET), каждая пачка
+    раскладывается по дням (UTC) в новые сегменты archive/<kind>/<YYYY-MM-DD>/ и только
+    после записи сегментов удаляется из базы пачками по DELETE_BATCH_SIZE. Существующие
+    сегменты не меняются. Если процесс упадет между записью и удалением, строки попадут
+    в архив повторно - при чтении дубликаты отбрасываются по id.
+
+    Спины переносятся только до водяного знака почасовых итогов (rolled_up_spin_id):
+    итоги строятся из спинов в базе, и перенесенный раньше времени спин в них бы не попал.
+
+    Возвращает количество перенесенных строк.
+    """
+    model, read_rows = ROW_SOURCES[kind]
+    root = Path(root) if root is not None else get_archive_root()
+
+    archived = 0
+    last_id = 0
+    while True:
+        rows = read_rows(cutoff, last_id, batch_size)
+        if not rows:
+            return archived
+
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row['time'].astimezone(dt_timezone.utc).date(), []).append(row)
+        for day, day_rows in by_day.items():
+            _write_segment(root / kind / day.isoformat(), day_rows)
+
+        ids = [row['id'] for row in rows]
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            with transaction.atomic():
+                model.objects.filter(id__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+
+        archived += len(rows)
+        last_id = ids[-1]
+
+
+def _day_directories(kind_root, start, end):
+    if not kind_root.exists():
+        return []
+    days = []
+    for directory in kind_root.iterdir():
+        try:
+            day = datetime.strptime(directory.name, '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        if (start is None or day >= start.astimezone(dt_timezone.utc).date()) and \
+                (end is None or day <= end.astimezone(dt_timezone.utc).date()):
+            days.append((day, directory))
+    return [directory for _, directory in sorted(days)]
+
+
+def _read_member(segment_path, entry):
+    with open(segment_path, 'rb') as segment:
+        segment.seek(entry['offset'])
+        data = gzip.decompress(segment.read(entry['length']))
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def read_archived_history(kind, user_id, start=None, end=None, limit=None, root=None):
+    """
+    Архивная история пользователя за период [start, end) без восстановления в базу.
+
+    По индексам сегментов выбираются только сегменты с этим пользователем и подходящим
+    диапазоном времени, и из каждого читается только gzip-член этого пользователя.
+    Возвращает список словарей по возрастанию времени (не больше limit).
+    """
+    if kind not in ROW_SOURCES:
+        raise ValueError(f"Unknown archive kind: {kind}")
+    root = Path(root) if root is not None else get_archive_root()
+
+    user_key = str(user_id)
+    rows = {}
+    for directory in _day_directories(root / kind, start, end):
+        for index_path in sorted(directory.glob('*.index.json')):
+            entry = json.loads(index_path.read_text())["users"].get(user_key)
+            if entry is None:
+                continue
+            if end is not None and datetime.fromisoformat(entry['first_time']) >= end:
+                continue
+            if start is not None and datetime.fromisoformat(entry['last_time']) < start:
+                continue
+            for row in _read_member(directory / index_path.name.replace('.index.json', '.jsonl.gz'), entry):
+                row_time = datetime.fromisoformat(row['time'])
+                if (start is None or row_time >= start) and (end is None or row_time < end):
+                    rows[row['id']] = row
+
+    ordered = sorted(rows.values(), key=lambda row: (datetime.fromisoformat(row['time']), row['id']))
+    return ordered if limit is None else ordered[:limit]
+
+
+def cutoff_for_days(days, now=None):
+    """Начало дня (UTC), до которого строки старше days дней переносятся в архив."""
+    now = now or datetime.now(dt_timezone.utc)
+    return datetime.combine((now - timedelta(days=days)).date(), time.min, tzinfo=dt_timezone.utc)
@@ -0,0 +1,143 @@
+import json
+from decimal import Decimal
+
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, ParseError
+
+from authentication.authentication import GameTokenAuthentication
+from authentication.wallet import InsufficientFunds, InvalidAmount, credit, parse_deposit_amount
+from shared.django.async_db import run_in_db_thread
+from shared.django.renderers import COMPACT_MEDIA_TYPE, dumps, to_compact
+from slot.compiled import get_compiled_machine
+from slot.serializers import BetSerializer, money_data, spin_result_data
+from slot.services import bet_error, play_spin
+
+# Async variants of the spin, balance and deposit endpoints for ASGI workers (config.asgi).
+# Request parsing, token validation and rendering run on the event loop; all database work of a
+# request runs as one call on the async DB thread pool, so the worker keeps serving other requests
+# while it waits for the database. Responses match the DRF views.
+
+_jwt = GameTokenAuthentication()
+
+
+def _response(data, status_code=status.HTTP_200_OK, compact=False):
+    # Same JSON as the sync views' FastJSONRenderer/CompactJSONRenderer (errors are never compacted)
+    if compact and status_code < 400:
+        return HttpResponse(dumps(to_compact(data)), status=status_code, content_type=COMPACT_MEDIA_TYPE)
+    return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+
+def _wants_compact(request):
+    return COMPACT_MEDIA_TYPE in request.headers.get('Accept', '')
+
+
+def _error_response(exc):
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+    response = _response(detail, exc.status_code)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        response['WWW-Authenticate'] = _jwt.authenticate_header(None)
+    return response
+
+
+def _validated_token(request):
+    """Validates the bearer token without touching the database (the user is loaded with the request's queries)."""
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        raise NotAuthenticated()
+    return _jwt.get_validated_token(raw_token)
+
+
+def _json_body(request):
+    if not request.body:
+        return {}
+    try:
+        # floats as Decimal, so 0.1 stays 0.1 for the decimal amount checks
+        data = json.loads(request.body, parse_float=Decimal)
+    except ValueError as exc:
+        raise ParseError(f"JSON parse error - {exc}")
+    if not isinstance(data, dict):
+        raise ParseError("JSON parse error - expected an object")
+    return data
+
+
+def async_api_view(view):
+    """Turns DRF exceptions and Http404 raised by an async view into JSON error responses."""
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            return _error_response(exc)
+        except Http404 as exc:
+            return _response({"detail": str(exc)}, status.HTTP_404_NOT_FOUND)
+
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return csrf_exempt(wrapper)
+
+
+def _spin(token, slot_machine_id, bet_amount, lines):
+    user = _jwt.get_user(token)
+    slot_machine = get_compiled_machine(slot_machine_id)
+    error = bet_error(slot_machine, bet_amount, lines)
+    if error:
+        return {"error": error}, status.HTTP_400_BAD_REQUEST
+
+    try:
+        spin_instance, winning_lines, session = play_spin(user, slot_machine, bet_amount, lines)
+    except InsufficientFunds:
+        return {"error": "Insufficient funds"}, status.HTTP_400_BAD_REQUEST
+
+    return {
+        "spin_result": spin_result_data(spin_instance),
+        "winning_lines": winning_lines,
+        "session_id": session.id,
+        "balance": money_data(user.balance)
+    }, status.HTTP_200_OK
+
+
+def _balance(token):
+    return {"balance": money_data(_jwt.get_user(token).balance)}, status.HTTP_200_OK
+
+
+def _deposit(token, amount):
+    user = _jwt.get_user(token)
+    credit(user, amount, 'DEPOSIT')
+    return {"message": "Deposit successful", "current_balance": money_data(user.balance)}, status.HTTP_200_OK
+
+
+@async_api_view
+@require_POST
+async def spin(request):
+    token = _validated_token(request)
+    serializer = BetSerializer(data=_json_body(request))
+    if not serializer.is_valid():
+        return _response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    # Debit, spin, winnings and session totals run as one transaction on a DB thread
+    data, status_code = await run_in_db_thread(_spin, token, **serializer.validated_data)
+    return _response(data, status_code, compact=_wants_compact(request))
+
+
+@async_api_view
+@require_GET
+async def balance(request):
+    token = _validated_token(request)
+    data, status_code = await run_in_db_thread(_balance, token)
+    return _response(data, status_code, compact=_wants_compact(request))
+
+
+@async_api_view
+@require_POST
+async def deposit(request):
+    token = _validated_token(request)
+    try:
+        amount = parse_deposit_amount(_json_body(request).get("amount", 0))
+    except InvalidAmount as exc:
+        return _response({"error": str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+    data, status_code = await run_in_db_thread(_deposit, token, amount)
+    return _response(data, status_code)
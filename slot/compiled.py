@@ -0,0 +1,231 @@
+import threading
+import time
+import uuid
+from types import MappingProxyType
+from typing import NamedTuple
+
+from django.conf import settings
+from django.http import Http404
+
+from .lookup import build_lookup_evaluator
+from .models import Payline, ReelStrip, SlotMachine, Symbol
+from .paylines import PaylineEvaluator
+from .sampling import AliasSampler, CellGridSampler, ReelStripSampler
+from .spin_codec import find_symbol_table, get_or_create_symbol_table
+from .ways import WaysEvaluator
+
+# Линии выплат по умолчанию, если у автомата нет кастомных линий в базе
+DEFAULT_PAYLINES = (
+    ((0, 0), (0, 1), (0, 2)),  # Line 1: Top row
+    ((1, 0), (1, 1), (1, 2)),  # Line 2: Middle row
+    ((2, 0), (2, 1), (2, 2)),  # Line 3: Bottom row
+    ((0, 0), (1, 1), (2, 2)),  # Line 4: Diagonal from top left to bottom right
+    ((0, 2), (1, 1), (2, 0)),  # Line 5: Diagonal from top right to bottom left
+)
+
+DEFAULT_VERSION_TTL = 1.0
+
+_compiled_machines = {}
+_compiled_machines_lock = threading.Lock()
+
+
+class CompiledMachine(NamedTuple):
+    """
+    Неизменяемый "скомпилированный" снимок конфигурации игрового автомата:
+    все, что нужно для спина, без обращений к ORM.
+    """
+
+    id: int
+    name: str
+    rows: int
+    cols: int
+    max_lines: int
+    evaluation_mode: str
+    min_bet: object
+    max_bet: object
+    symbol_names: tuple
+    symbol_index: MappingProxyType
+    symbol_weights: tuple
+    reel_strips: tuple
+    grid_sampler: object
+    payouts: tuple
+    payouts_by_length: tuple
+    payout_table: MappingProxyType
+    paylines: tuple
+    evaluator: object
+    lookup: object
+    symbol_table_id: int
+
+    @property
+    def available_lines(self):
+        """Максимальное количество линий, на которое можно сделать ставку (в режиме ways - одна)."""
+        return min(self.max_lines, self.evaluator.lines)
+
+    @property
+    def spin_evaluator(self):
+        """Оценщик для спинов и симуляции: таблица исходов, если она включена, иначе evaluator."""
+        return self.lookup or self.evaluator
+
+
+def compile_machine(slot_machine):
+    """
+    Собирает CompiledMachine из объекта SlotMachine, его символов и линий выплат.
+    """
+    symbols = list(Symbol.objects.filter(slot_machine=slot_machine).order_by('id'))
+    custom_paylines = Payline.objects.filter(slot_machine=slot_machine).order_by('line_number')
+
+    # Если есть кастомные линии, преобразуем их из JSON в кортежи координат, иначе используем стандартные
+    paylines = tuple(
+        tuple((coord['row'], coord['col']) for coord in payline.coordinates)
+        for payline in custom_paylines
+    ) or DEFAULT_PAYLINES
+
+    names = tuple(symbol.symbol_name for symbol in symbols)
+    weights = tuple(symbol.symbol_count for symbol in symbols)
+    payouts = tuple(symbol.payout for symbol in symbols)
+    payouts_by_length = tuple(symbol.payouts_by_length for symbol in symbols)
+
+    # Если у автомата заданы ленты барабанов, спин выбирает позиции остановки барабанов,
+    # иначе каждая ячейка выбирается независимо по весам символов
+    reel_strips = tuple(
+        tuple(strip.symbols)
+        for strip in ReelStrip.objects.filter(slot_machine=slot_machine).order_by('reel_number')
+    )
+    if reel_strips:
+        grid_sampler = ReelStripSampler(_encode_reel_strips(reel_strips, names, slot_machine.cols), slot_machine.rows)
+    else:
+        grid_sampler = CellGridSampler(AliasSampler(weights), slot_machine.rows, slot_machine.cols)
+
+    if slot_machine.evaluation_mode == SlotMachine.MODE_WAYS:
+        evaluator = WaysEvaluator.from_config(slot_machine.rows, slot_machine.cols, payouts, payouts_by_length)
+    else:
+        evaluator = PaylineEvaluator.from_config(
+            paylines, slot_machine.rows, slot_machine.cols, payouts, payouts_by_length
+        )
+
+    # Таблицу символов создают сигналы при изменении автомата (create_symbol_table), здесь - только чтение
+    symbol_table = find_symbol_table(slot_machine.id, names, slot_machine.rows, slot_machine.cols)
+    if symbol_table is None:
+        raise ValueError(
+            f"Slot machine {slot_machine.id} has no symbol table for its current symbols, save the machine to create it"
+        )
+
+    # Таблица всех исходов - только по флагу автомата и только если она достаточно мала
+    lookup = None
+    if slot_machine.use_lookup_table:
+        lookup = build_lookup_evaluator(evaluator, len(names), slot_machine.rows * slot_machine.cols)
+
+    return CompiledMachine(
+        id=slot_machine.id,
+        name=slot_machine.name,
+        rows=slot_machine.rows,
+        cols=slot_machine.cols,
+        max_lines=slot_machine.max_lines,
+        evaluation_mode=slot_machine.evaluation_mode,
+        min_bet=slot_machine.min_bet,
+        max_bet=slot_machine.max_bet,
+        symbol_names=names,
+        symbol_index=MappingProxyType({name: index for index, name in enumerate(names)}),
+        symbol_weights=weights,
+        reel_strips=reel_strips,
+        grid_sampler=grid_sampler,
+        payouts=payouts,
+        payouts_by_length=payouts_by_length,
+        payout_table=MappingProxyType(dict(zip(names, payouts))),
+        paylines=paylines,
+        evaluator=evaluator,
+        lookup=lookup,
+        symbol_table_id=symbol_table.id,
+    )
+
+
+def create_symbol_table(slot_machine_id, names=None, rows=None, cols=None):
+    """
+    Создает таблицу символов автомата для списка имен и размеров сетки (по умолчанию -
+    текущие из базы). Вызывается сигналами до сохранения автомата или его символов, поэтому
+    таблица уже есть, когда другие процессы видят новую конфигурацию, и compile_machine
+    на пути спина ее только читает.
+    """
+    shape = SlotMachine.objects.filter(id=slot_machine_id).values('rows', 'cols').first()
+    if shape is None:
+        return None
+    if names is None:
+        names = Symbol.objects.filter(slot_machine_id=slot_machine_id).order_by('id').values_list('symbol_name', flat=True)
+    return get_or_create_symbol_table(
+        slot_machine_id, list(names), shape['rows'] if rows is None else rows, shape['cols'] if cols is None else cols
+    )
+
+
+def _encode_reel_strips(reel_strips, names, cols):
+    """
+    Переводит ленты барабанов из имен символов в индексы символов.
+    """
+    if len(reel_strips) != cols:
+        raise ValueError(f"Slot machine has {len(reel_strips)} reel strips, expected one per column ({cols})")
+
+    symbol_index = {name: index for index, name in enumerate(names)}
+    unknown = {name for strip in reel_strips for name in strip} - symbol_index.keys()
+    if unknown:
+        raise ValueError(f"Reel strips use unknown symbols: {sorted(unknown)}")
+
+    return [[symbol_index[name] for name in strip] for strip in reel_strips]
+
+
+def version_ttl():
+    """
+    Как часто процесс сверяет версию конфигурации автомата с базой, в секундах
+    (settings.COMPILED_MACHINE_VERSION_TTL). Изменения доходят до всех процессов за это время.
+    """
+    return getattr(settings, 'COMPILED_MACHINE_VERSION_TTL', DEFAULT_VERSION_TTL)
+
+
+def get_compiled_machine(slot_machine_id):
+    """
+    Возвращает CompiledMachine из кеша процесса. Версия конфигурации
+    (SlotMachine.config_version) читается из базы не чаще раза в version_ttl()
+    секунд; автомат пересобирается, только если она изменилась.
+    Бросает Http404, если автомата нет.
+    """
+    now = time.monotonic()
+    cached = _compiled_machines.get(slot_machine_id)
+    if cached is not None and now - cached[1] < version_ttl():
+        return cached[2]
+
+    version = SlotMachine.objects.filter(id=slot_machine_id).values_list('config_version', flat=True).first()
+    if version is None:
+        with _compiled_machines_lock:
+            _compiled_machines.pop(slot_machine_id, None)
+        raise Http404("No SlotMachine matches the given query.")
+
+    if cached is not None and cached[0] == version:
+        with _compiled_machines_lock:
+            _compiled_machines[slot_machine_id] = (version, now, cached[2])
+        return cached[2]
+
+    slot_machine = SlotMachine.objects.filter(id=slot_machine_id).first()
+    if slot_machine is None:
+        raise Http404("No SlotMachine matches the given query.")
+
+    compiled = compile_machine(slot_machine)
+    with _compiled_machines_lock:
+        _compiled_machines[slot_machine_id] = (slot_machine.config_version, now, compiled)
+    return compiled
+
+
+def as_compiled_machine(slot_machine):
+    """
+    Принимает SlotMachine или CompiledMachine и возвращает CompiledMachine.
+    """
+    if isinstance(slot_machine, CompiledMachine):
+        return slot_machine
+    return get_compiled_machine(slot_machine.id)
+
+
+def invalidate_compiled_machine(slot_machine_id):
+    """
+    Сбрасывает скомпилированный автомат: в этом процессе сразу, в остальных -
+    при следующей сверке версии, замененной в базе.
+    """
+    SlotMachine.objects.filter(id=slot_machine_id).update(config_version=uuid.uuid4())
+    with _compiled_machines_lock:
+        _compiled_machines.pop(slot_machine_id, None)
@@ -0,0 +1,126 @@
+import math
+
+import numpy as np
+
+from .simulation import RunningStats
+
+# Границы корзин гистограммы выигрышей в множителях ставки: корзина "0" - спины
+# без выигрыша, далее (0, 1], (1, 2], ..., (500, 1000] и "1000+".
+HISTOGRAM_EDGES = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+# Относительная точность скетча квантилей: оценка квантиля отличается
+# от точного значения не более чем на 0.5%.
+SKETCH_RELATIVE_ACCURACY = 0.005
+
+QUANTILES = (0.99, 0.999, 0.9999)
+
+
+def histogram_labels():
+    labels = ["0"]
+    for lower, upper in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:]):
+        labels.append(f"{lower}-{upper}")
+    labels.append(f"{HISTOGRAM_EDGES[-1]}+")
+    return labels
+
+
+class QuantileSketch:
+    """
+    Объединяемый скетч квантилей с логарифмическими корзинами (в духе DDSketch).
+
+    Положительное значение x попадает в корзину ceil(log_gamma(x)), поэтому число
+    корзин растет только с логарифмом диапазона выплат, а не с количеством спинов.
+    Нулевые выплаты считаются отдельно. Скетчи объединяются сложением счетчиков.
+    """
+
+    __slots__ = ('zero_count', 'bins')
+
+    gamma = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self):
+        self.zero_count = 0
+        self.bins = {}
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.bins.values())
+
+    def push_batch(self, values):
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        if len(positive) == 0:
+            return
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other):
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        return self
+
+    def quantile(self, q):
+        """Оценка квантиля q (от 0 до 1) с относительной погрешностью SKETCH_RELATIVE_ACCURACY."""
+        count = self.count
+        if count == 0:
+            return 0.0
+        rank = q * (count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+class PayoutDistribution(RunningStats):
+    """
+    Потоковая статистика распределения выигрышей за спин с ограниченной памятью:
+    среднее и дисперсия, частота выигрышей, максимальный выигрыш, гистограмма
+    по множителям ставки и скетч квантилей. Объединяется через merge, поэтому
+    подходит для блочной и многопроцессной симуляции вместо RunningStats.
+    """
+
+    __slots__ = ('max_win', 'histogram', 'sketch')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        super().__init__(count, mean, m2)
+        self.max_win = 0.0
+        self.histogram = np.zeros(len(HISTOGRAM_EDGES) + 1, dtype=np.int64)
+        self.sketch = QuantileSketch()
+
+    def push_batch(self, values):
+        if len(values) == 0:
+            return
+        super().push_batch(values)
+        self.max_win = max(self.max_win, float(values.max()))
+        buckets = np.searchsorted(HISTOGRAM_EDGES, values, side='left')
+        self.histogram += np.bincount(buckets, minlength=len(self.histogram))
+        self.sketch.push_batch(values)
+
+    def merge(self, other):
+        super().merge(other)
+        if isinstance(other, PayoutDistribution):
+            self.max_win = max(self.max_win, other.max_win)
+            self.histogram += other.histogram
+            self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self):
+        """
+        Итоговая статистика в виде словаря (выигрыши - в множителях ставки).
+        """
+        return {
+            "spins": self.count,
+            "rtp": self.mean * 100,
+            "volatility": self.variance ** 0.5,
+            "hit_frequency": self.hits / self.count if self.count else 0.0,
+            "max_win": self.max_win,
+            "quantiles": {
+                f"p{q * 100:g}": self.sketch.quantile(q) for q in QUANTILES
+            },
+            "histogram": dict(zip(histogram_labels(), self.histogram.tolist())),
+        }
@@ -0,0 +1,271 @@
+import math
+
+import numpy as np
+
+# Предел полного перебора комбинаций остановок барабанов для точного расчета
+MAX_REEL_COMBINATIONS = 50000000
+
+ENUMERATION_BATCH_SIZE = 65536
+
+
+def _line_events(evaluator, line_index):
+    """
+    События выигрыша линии: для каждой длины серии a, за которую что-то платится,
+    возвращает (a, A, c), где A - множество ячеек первых a позиций линии, а c - ячейка
+    позиции a ("стоп-ячейка", которая должна отличаться от символа серии) или None,
+    если серия занимает всю линию.
+    """
+    cells = evaluator.line_cells[line_index][evaluator.line_mask[line_index]].tolist()
+    payable = np.nonzero(evaluator.pay_table[line_index].any(axis=0))[0]
+
+    events = []
+    for run in payable.tolist():
+        prefix = frozenset(cells[:run])
+        stop = cells[run] if run < len(cells) else None
+        if stop is not None and stop in prefix:
+            continue
+        events.append((run, prefix, stop))
+    return events
+
+
+def _event_probabilities(probabilities, prefix, stop):
+    """Вероятность события (серия ровно на prefix) для каждого символа."""
+    result = probabilities ** len(prefix)
+    if stop is not None:
+        result = result * (1 - probabilities)
+    return result
+
+
+def _joint_line_moment(probabilities, pay_i, events_i, pay_j, events_j):
+    """
+    E[X_i * X_j] для двух разных линий с общими ячейками.
+
+    Если символы серий совпадают, ячейки обеих серий заняты этим символом, а
+    стоп-ячейки - любым другим. Если символы разные, серии не могут пересекаться,
+    стоп-ячейка одной линии внутри серии другой линии выполняется автоматически,
+    а общая стоп-ячейка должна отличаться от обоих символов.
+    """
+    total = 0.0
+    outside = 1 - probabilities
+    for run_i, prefix_i, stop_i in events_i:
+        for run_j, prefix_j, stop_j in events_j:
+            values_i = pay_i[:, run_i]
+            values_j = pay_j[:, run_j]
+
+            # оба выигрыша одним и тем же символом
+            if (stop_i is None or stop_i not in prefix_j) and (stop_j is None or stop_j not in prefix_i):
+                stops = {stop_i, stop_j} - {None}
+                same = probabilities ** len(prefix_i | prefix_j) * outside ** len(stops)
+                total += float(np.dot(values_i * values_j, same))
+
+            # выигрыши разными символами
+            if prefix_i & prefix_j:
+                continue
+            joint = np.outer(
+                values_i * probabilities ** len(prefix_i),
+                values_j * probabilities ** len(prefix_j),
+            )
+            if stop_i is not None and stop_i == stop_j:
+                joint *= 1 - probabilities[:, np.newaxis] - probabilities[np.newaxis, :]
+            else:
+                if stop_i is not None and stop_i not in prefix_j:
+                    joint *= outside[:, np.newaxis]
+                if stop_j is not None and stop_j not in prefix_i:
+                    joint *= outside[np.newaxis, :]
+            np.fill_diagonal(joint, 0.0)
+            total += float(joint.sum())
+    return total
+
+
+def exact_line_moments(probabilities, evaluator):
+    """
+    Точный расчет первых двух моментов выигрыша за спин для модели
+    независимых ячеек (каждая ячейка выпадает по вероятностям символов).
+
+    Линия выигрывает серией длины a символом s, если первые a ячеек линии равны s,
+    а следующая ячейка (если есть) отличается от s - вероятность p_s^a * (1 - p_s).
+    Выигрыши линий без общих ячеек независимы, для линий с общими ячейками
+    совместные вероятности считаются по ячейкам (см. _joint_line_moment).
+
+    Возвращает:
+    - mean: ожидаемый выигрыш за спин при ставке 1 на линию.
+    - variance: дисперсия выигрыша за спин.
+    - symbol_line_hits: матрица (линии x символы) вероятностей выигрыша линии символом.
+    """
+    pay_table = evaluator.pay_table / 100
+    lines = evaluator.lines
+
+    events = [_line_events(evaluator, line_index) for line_index in range(lines)]
+    line_cells = [
+        frozenset().union(*[prefix | ({stop} - {None}) for _, prefix, stop in line_events])
+        for line_events in events
+    ]
+
+    symbol_line_hits = np.zeros((lines, len(probabilities)))
+    line_means = np.zeros(lines)
+    second_moment = 0.0
+    for line_index, line_events in enumerate(events):
+        for run, prefix, stop in line_events:
+            event = _event_probabilities(probabilities, prefix, stop)
+            values = pay_table[line_index, :, run]
+            symbol_line_hits[line_index] += np.where(values > 0, event, 0.0)
+            line_means[line_index] += float(np.dot(values, event))
+            # события разных длин серии одной линии несовместны
+            second_moment += float(np.dot(values ** 2, event))
+
+    for i in range(lines):
+        for j in range(i + 1, lines):
+            if line_cells[i] & line_cells[j]:
+                joint = _joint_line_moment(probabilities, pay_table[i], events[i], pay_table[j], events[j])
+            else:
+                joint = line_means[i] * line_means[j]
+            second_moment += 2 * joint
+
+    mean = float(line_means.sum())
+    variance = max(float(second_moment) - mean ** 2, 0.0)
+    return mean, variance, symbol_line_hits
+
+
+def _column_factor(kind, count):
+    """Множитель барабана в формуле выигрыша ways: количество, признак нуля или 1."""
+    if kind == 'count':
+        return count
+    if kind == 'zero':
+        return 1 if count == 0 else 0
+    return 1
+
+
+def _column_kinds(run, cols):
+    """Для серии длины run: барабаны до run дают количество, барабан run - должен быть пуст."""
+    return ['count' if reel < run else 'zero' if reel == run else 'one' for reel in range(cols)]
+
+
+def _pair_column_expectations(rows, p_s, p_t):
+    """
+    E[f(c_s) * g(c_t)] для одного барабана, где (c_s, c_t) - количества двух разных
+    символов на барабане из rows независимых ячеек (мультиномиальное распределение).
+    """
+    rest = max(1 - p_s - p_t, 0.0)
+    kinds = ('count', 'zero', 'one')
+    expectations = {(kind_s, kind_t): 0.0 for kind_s in kinds for kind_t in kinds}
+    for count_s in range(rows + 1):
+        for count_t in range(rows + 1 - count_s):
+            probability = (
+                math.comb(rows, count_s) * math.comb(rows - count_s, count_t)
+                * p_s ** count_s * p_t ** count_t * rest ** (rows - count_s - count_t)
+            )
+            for kind_s in kinds:
+                for kind_t in kinds:
+                    expectations[kind_s, kind_t] += (
+                        probability * _column_factor(kind_s, count_s) * _column_factor(kind_t, count_t)
+                    )
+    return expectations
+
+
+def exact_ways_moments(probabilities, evaluator):
+    """
+    Точный расчет первых двух моментов выигрыша за спин в режиме "ways".
+
+    Количество символа на барабане - биномиальная величина Bin(rows, p), барабаны
+    независимы, поэтому E[ways * 1(серия ровно k)] = (rows * p)^k * (1 - p)^rows
+    (последний множитель - только если k < cols). Для пар разных символов
+    ожидания по каждому барабану считаются по мультиномиальному распределению.
+
+    Возвращает то же, что exact_line_moments; все выигрыши режима - одна "линия".
+    """
+    rows, cols = evaluator.rows, evaluator.cols
+    pay_table = evaluator.pay_table / 100
+    symbols = len(probabilities)
+
+    events = [np.nonzero(pay_table[symbol])[0].tolist() for symbol in range(symbols)]
+
+    symbol_hits = np.zeros(symbols)
+    symbol_means = np.zeros(symbols)
+    second_moment = 0.0
+    for symbol, runs in enumerate(events):
+        p = probabilities[symbol]
+        empty = (1 - p) ** rows
+        mean_count = rows * p
+        mean_square_count = rows * p * (1 - p) + mean_count ** 2
+        for run in runs:
+            tail = empty if run < cols else 1.0
+            value = pay_table[symbol, run]
+            symbol_hits[symbol] += (1 - empty) ** run * tail
+            symbol_means[symbol] += value * mean_count ** run * tail
+            # разные длины серии одного символа несовместны
+            second_moment += value ** 2 * mean_square_count ** run * tail
+
+    for s in range(symbols):
+        for t in range(s + 1, symbols):
+            if not events[s] or not events[t]:
+                continue
+            expectations = _pair_column_expectations(rows, probabilities[s], probabilities[t])
+            joint = 0.0
+            for run_s in events[s]:
+                for run_t in events[t]:
+                    product = 1.0
+                    for kind_s, kind_t in zip(_column_kinds(run_s, cols), _column_kinds(run_t, cols)):
+                        product *= expectations[kind_s, kind_t]
+                    joint += pay_table[s, run_s] * pay_table[t, run_t] * product
+            second_moment += 2 * joint
+
+    mean = float(symbol_means.sum())
+    variance = max(float(second_moment) - mean ** 2, 0.0)
+    return mean, variance, symbol_hits[np.newaxis, :]
+
+
+def exact_lookup_moments(probabilities, evaluator):
+    """
+    Точный расчет для модели независимых ячеек по таблице исходов LookupEvaluator:
+    выигрыши всех сеток уже посчитаны, поэтому моменты - это взвешенные суммы
+    по вероятностям сеток (произведение вероятностей символов в ячейках).
+
+    Возвращает то же, что exact_line_moments.
+    """
+    table = evaluator.table
+    mean = 0.0
+    second_moment = 0.0
+    hits = 0.0
+    for start in range(0, table.outcomes, table.batch_size):
+        codes = np.arange(start, min(start + table.batch_size, table.outcomes))
+        weights = table.outcome_probabilities(codes, probabilities)
+        wins = table.wins[codes, :evaluator.columns].sum(axis=1, dtype=np.int64) / 100
+        mean += float(np.dot(weights, wins))
+        second_moment += float(np.dot(weights, wins ** 2))
+        hits += evaluator.win_counts(table.decode(codes), weights)
+
+    variance = max(second_moment - mean ** 2, 0.0)
+    return mean, variance, hits
+
+
+def exact_reel_moments(reel_sampler, evaluator, max_combinations=MAX_REEL_COMBINATIONS,
+                       batch_size=ENUMERATION_BATCH_SIZE):
+    """
+    Точный расчет для модели ленточных барабанов полным перебором всех комбинаций
+    позиций остановки (все комбинации равновероятны). Перебор идет блоками,
+    выигрыши суммируются в целых центах, поэтому результат точный.
+
+    Возвращает то же, что exact_line_moments. Если комбинаций больше
+    max_combinations, бросает ValueError.
+    """
+    combinations = reel_sampler.combinations
+    if combinations > max_combinations:
+        raise ValueError(
+            f"Reel strips have {combinations} stop combinations, exact enumeration is limited to {max_combinations}"
+        )
+
+    total = 0
+    total_squares = 0
+    hits = 0
+    for start in range(0, combinations, batch_size):
+        indices = np.arange(start, min(start + batch_size, combinations))
+        stops = np.stack(np.unravel_index(indices, reel_sampler.strip_lengths), axis=1)
+        grids = reel_sampler.grids_from_stops(stops)
+        wins = evaluator.score_batch(grids)
+        total += int(wins.sum())
+        total_squares += int(np.dot(wins, wins))
+        hits += evaluator.win_counts(grids)
+
+    mean = total / combinations / 100
+    variance = max(total_squares / combinations / 10000 - mean ** 2, 0.0)
+    return mean, variance, hits / combinations
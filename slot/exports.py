@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import zlib
+
+from authentication.models import Transaction
+from .archive import KIND_SPINS, KIND_TRANSACTIONS, SPIN_FIELDS, TRANSACTION_FIELDS, spin_record, transaction_record
+from .models import Spin
+
+FORMAT_NDJSON = 'ndjson'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+
+CONTENT_TYPES = {
+    FORMAT_NDJSON: 'application/x-ndjson',
+    FORMAT_CSV: 'text/csv',
+}
+
+CSV_COLUMNS = {
+    KIND_TRANSACTIONS: ['id', 'user_id', 'time', 'transaction_type', 'amount', 'balance_after'],
+    KIND_SPINS: ['id', 'user_id', 'time', 'game_session_id', 'slot_machine_id', 'bet_amount', 'lines',
+                 'result', 'winnings'],
+}
+
+# Строк, читаемых из курсора базы за один раз
+DEFAULT_CHUNK_SIZE = 2000
+# Размер блока байт, отдаваемого клиенту (до сжатия)
+BLOCK_SIZE = 64 * 1024
+
+
+def _transaction_records(user_id, start, end, chunk_size):
+    transactions = Transaction.objects.all()
+    if user_id is not None:
+        transactions = transactions.filter(user_id=user_id)
+    if start is not None:
+        transactions = transactions.filter(created_at__gte=start)
+    if end is not None:
+        transactions = transactions.filter(created_at__lt=end)
+    for row in transactions.order_by('id').values(*TRANSACTION_FIELDS).iterator(chunk_size=chunk_size):
+        yield transaction_record(row)
+
+
+def _spin_records(user_id, start, end, chunk_size):
+    spins = Spin.objects.select_related('game_session').only(*SPIN_FIELDS)
+    if user_id is not None:
+        spins = spins.filter(game_session__user_id=user_id)
+    if start is not None:
+        spins = spins.filter(spin_time__gte=start)
+    if end is not None:
+        spins = spins.filter(spin_time__lt=end)
+    for spin in spins.order_by('id').iterator(chunk_size=chunk_size):
+        yield spin_record(spin)
+
+
+RECORD_SOURCES = {
+    KIND_TRANSACTIONS: _transaction_records,
+    KIND_SPINS: _spin_records,
+}
+
+
+def _ndjson_lines(kind, records):
+    for record in records:
+        yield json.dumps({**record, "time": record['time'].isoformat()}) + '\n'
+
+
+def _csv_lines(kind, records):
+    columns = CSV_COLUMNS[kind]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(columns)
+    for record in records:
+        record = {**record, "time": record['time'].isoformat()}
+        if 'result' in record:
+            record['result'] = json.dumps(record['result'])
+        yield line([record[column] for column in columns])
+
+
+ENCODERS = {
+    FORMAT_NDJSON: _ndjson_lines,
+    FORMAT_CSV: _csv_lines,
+}
+
+
+def _blocks(lines, block_size):
+    """Склеивает строки в блоки байт примерно по block_size."""
+    block = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        size += len(data)
+        if size >= block_size:
+            yield b''.join(block)
+            block = []
+            size = 0
+    if block:
+        yield b''.join(block)
+
+
+def _gzip(blocks):
+    """
+    Сжимает поток блоков в один gzip-файл. Каждый блок сбрасывается (Z_SYNC_FLUSH),
+    чтобы клиент получал данные сразу, а не после заполнения внутреннего буфера zlib.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for block in blocks:
+        data = compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_history(kind, export_format=FORMAT_NDJSON, user_id=None, start=None, end=None, compress=False,
+                   chunk_size=DEFAULT_CHUNK_SIZE, block_size=BLOCK_SIZE, all_users=False):
+    """
+    Генератор байт выгрузки истории (транзакции или спины) пользователя user_id
+    за период [start, end) в формате NDJSON или CSV, по желанию сжатой gzip.
+    История всех пользователей выгружается только при явном all_users=True.
+
+    Строки читаются по возрастанию id через iterator(chunk_size) (на PostgreSQL -
+    серверный курсор) и кодируются по мере чтения, поэтому память не зависит от
+    размера выгрузки, а первые байты готовы после первых строк.
+    """
+    if kind not in RECORD_SOURCES:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if export_format not in ENCODERS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if user_id is None and not all_users:
+        raise ValueError("user_id is required unless all_users=True")
+    if user_id is not None and all_users:
+        raise ValueError("Pass either user_id or all_users=True, not both")
+
+    records = RECORD_SOURCES[kind](user_id, start, end, chunk_size)
+    blocks = _blocks(ENCODERS[export_format](kind, records), block_size)
+    return _gzip(blocks) if compress else blocks
+
+
+def export_filename(kind, export_format, compress=False):
+    return f"{kind}.{export_format}" + ('.gz' if compress else '')
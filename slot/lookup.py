@@ -0,0 +1,120 @@
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Предел размера таблицы исходов (исходы x столбцы выигрышей); больше - таблица не строится
+MAX_LOOKUP_ENTRIES = 1 << 23
+
+ENUMERATION_BATCH_SIZE = 65536
+
+
+class OutcomeTable:
+    """
+    Таблица всех исходов спина: для каждой возможной сетки - выигрыши, которые
+    возвращает оценщик (по линиям или по символам в режиме "ways"), в центах.
+
+    Сетка кодируется целым числом: ячейка i - цифра позиционной записи по основанию
+    "количество символов" (code = sum(grid[i] * symbols ** i)). Таблица строится
+    лениво при первом обращении, один раз на процесс и версию конфигурации
+    (она живет в CompiledMachine).
+    """
+
+    def __init__(self, evaluator, symbols, cells, batch_size=ENUMERATION_BATCH_SIZE):
+        self.evaluator = evaluator
+        self.symbols = symbols
+        self.cells = cells
+        self.outcomes = symbols ** cells
+        self.batch_size = batch_size
+        self.powers = symbols ** np.arange(cells, dtype=np.int64)
+        self.powers.setflags(write=False)
+        self._wins = None
+        self._lock = threading.Lock()
+
+    def encode(self, grids):
+        """Коды сеток: одна сетка (список индексов символов) или блок (N x cells)."""
+        return np.asarray(grids) @ self.powers
+
+    def decode(self, codes):
+        """Сетки (N x cells) по массиву кодов."""
+        return codes[:, np.newaxis] // self.powers % self.symbols
+
+    @property
+    def wins(self):
+        """Массив (исходы x столбцы выигрышей) в центах, строится при первом обращении."""
+        if self._wins is None:
+            with self._lock:
+                if self._wins is None:
+                    self._wins = self._build()
+        return self._wins
+
+    def _build(self):
+        blocks = [
+            self.evaluator.line_wins(self.decode(np.arange(start, min(start + self.batch_size, self.outcomes))))
+            for start in range(0, self.outcomes, self.batch_size)
+        ]
+        wins = np.concatenate(blocks)
+        if wins.max(initial=0) <= np.iinfo(np.int32).max:
+            wins = wins.astype(np.int32)
+        wins.setflags(write=False)
+        return wins
+
+    def outcome_probabilities(self, codes, probabilities):
+        """Вероятности исходов codes в модели независимых ячеек."""
+        return np.prod(probabilities[self.decode(codes)], axis=1)
+
+
+class LookupEvaluator:
+    """
+    Оценщик с интерфейсом PaylineEvaluator/WaysEvaluator поверх OutcomeTable:
+    оценка спина или блока сеток - кодирование сетки и одна выборка из таблицы
+    вместо поиска серий по линиям.
+    """
+
+    def __init__(self, evaluator, table, columns=None):
+        self.evaluator = evaluator
+        self.table = table
+        self.columns = columns
+
+    @property
+    def lines(self):
+        return self.evaluator.lines
+
+    def for_lines(self, lines):
+        evaluator = self.evaluator.for_lines(lines)
+        if evaluator is self.evaluator:
+            return self
+        return LookupEvaluator(evaluator, self.table, lines)
+
+    def line_wins(self, grids):
+        return self.table.wins[self.table.encode(grids), :self.columns]
+
+    def win_counts(self, grids, weights=None):
+        return self.evaluator.win_counts(grids, weights)
+
+    def score(self, grid):
+        return self.table.wins[self.table.encode(grid), :self.columns]
+
+    def score_batch(self, grids):
+        return self.line_wins(grids).sum(axis=1, dtype=np.int64)
+
+    def spin_returns(self, grids):
+        return self.score_batch(grids) / (100 * self.lines)
+
+
+def build_lookup_evaluator(evaluator, symbols, cells, max_entries=MAX_LOOKUP_ENTRIES):
+    """
+    Возвращает LookupEvaluator для оценщика автомата или None, если таблица исходов
+    была бы больше max_entries элементов. Сама таблица строится позже, при первом спине.
+    """
+    columns = len(evaluator.score(np.zeros(cells, dtype=np.int64)))
+    entries = symbols ** cells * columns
+    if entries > max_entries:
+        logger.warning(
+            "Outcome lookup table is disabled: %s^%s outcomes x %s columns exceeds %s entries",
+            symbols, cells, columns, max_entries,
+        )
+        return None
+    return LookupEvaluator(evaluator, OutcomeTable(evaluator, symbols, cells))
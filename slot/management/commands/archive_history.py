@@ -0,0 +1,33 @@
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from slot.archive import DEFAULT_BATCH_SIZE, KINDS, archive_history, cutoff_for_days
+
+
+class Command(BaseCommand):
+    help = (
+        "Move Spin and Transaction history older than a cutoff into compressed archive segments. "
+        "Spins are only archived once update_hourly_stats has counted them"
+    )
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group(required=True)
+        cutoff.add_argument('--days', type=int, help="Archive rows older than this many days")
+        cutoff.add_argument('--before', help="Archive rows before this UTC date (YYYY-MM-DD)")
+        parser.add_argument('--kind', choices=KINDS, action='append', help="What to archive (default: all)")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per segment batch")
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                day = datetime.strptime(options['before'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--before must be a date in YYYY-MM-DD format")
+            cutoff = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        else:
+            cutoff = cutoff_for_days(options['days'])
+
+        for kind in options['kind'] or KINDS:
+            archived = archive_history(kind, cutoff, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{kind}: archived {archived} rows before {cutoff.isoformat()}"))
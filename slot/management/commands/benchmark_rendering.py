@@ -0,0 +1,105 @@
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from shared.django.renderers import CompactJSONRenderer, FastJSONRenderer
+from slot.models import Spin
+from slot.serializers import SpinResultSerializer, spin_result_data
+
+SYMBOLS = ["Apple", "Banana", "Citrus", "Strawberry"]
+
+
+def _sample_spin(rows, cols):
+    spin = Spin(
+        spin_result=[[SYMBOLS[(row + col) % len(SYMBOLS)] for row in range(rows)] for col in range(cols)],
+        winnings=Decimal('12.50'),
+    )
+    spin.spin_time = timezone.now()
+    return spin
+
+
+def _autoplay_payload(spins, cells):
+    return {
+        "symbols": SYMBOLS,
+        "results": [[[i % len(SYMBOLS) for i in range(cells)], "1.50", [1, 3]] for _ in range(spins)],
+        "spins_played": spins,
+        "total_bet": f"{spins}.00",
+        "total_winnings": f"{spins * 1.5:.2f}",
+        "stop_reason": "completed",
+        "balance": "1234.56",
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark of per-response CPU for the spin, balance and autoplay payloads: "
+        "DRF serializer + negotiation + JSONRenderer vs the fast and compact rendering paths"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20000, help="Responses rendered per measurement")
+        parser.add_argument('--rows', type=int, default=3)
+        parser.add_argument('--cols', type=int, default=5)
+        parser.add_argument('--autoplay-spins', type=int, default=100)
+
+    def measure(self, func, number):
+        """Best of three runs, microseconds per call"""
+        return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+    def handle(self, *args, **options):
+        number = options['number']
+        spin = _sample_spin(options['rows'], options['cols'])
+        negotiation = DefaultContentNegotiation()
+        request = Request(APIRequestFactory().post('/slot/spin/', HTTP_ACCEPT='application/json'))
+        compact_request = Request(APIRequestFactory().post('/slot/spin/', HTTP_ACCEPT=CompactJSONRenderer.media_type))
+        drf_renderers = [JSONRenderer(), BrowsableAPIRenderer()]
+        fast_renderers = [FastJSONRenderer(), CompactJSONRenderer()]
+
+        def spin_payload(spin_data):
+            return {"spin_result": spin_data, "winning_lines": [1, 3], "session_id": 42, "balance": "987.50"}
+
+        def drf(request, payload):
+            renderer, media_type = negotiation.select_renderer(request, drf_renderers)
+            return renderer.render(payload(), media_type, {})
+
+        def fast(request, payload):
+            renderer, media_type = negotiation.select_renderer(request, fast_renderers)
+            return renderer.render(payload(), media_type, {})
+
+        autoplay = _autoplay_payload(options['autoplay_spins'], options['rows'] * options['cols'])
+        cases = [
+            (
+                "spin",
+                lambda: drf(request, lambda: spin_payload(SpinResultSerializer(spin).data)),
+                lambda: fast(request, lambda: spin_payload(spin_result_data(spin))),
+                lambda: fast(compact_request, lambda: spin_payload(spin_result_data(spin))),
+            ),
+            (
+                "balance",
+                lambda: drf(request, lambda: {"balance": "987.50"}),
+                lambda: fast(request, lambda: {"balance": "987.50"}),
+                lambda: fast(compact_request, lambda: {"balance": "987.50"}),
+            ),
+            (
+                f"autoplay x{options['autoplay_spins']}",
+                lambda: drf(request, lambda: autoplay),
+                lambda: fast(request, lambda: autoplay),
+                lambda: fast(compact_request, lambda: autoplay),
+            ),
+        ]
+
+        self.stdout.write(f"{'payload':<16}{'drf us':>10}{'fast us':>10}{'compact us':>12}{'saved us':>10}{'bytes':>14}")
+        for name, drf_case, fast_case, compact_case in cases:
+            drf_time = self.measure(drf_case, number)
+            fast_time = self.measure(fast_case, number)
+            compact_time = self.measure(compact_case, number)
+            sizes = f"{len(drf_case())}/{len(compact_case())}"
+            self.stdout.write(
+                f"{name:<16}{drf_time:>10.1f}{fast_time:>10.1f}{compact_time:>12.1f}{drf_time - fast_time:>10.1f}{sizes:>14}"
+            )
@@ -0,0 +1,127 @@
+import http.client
+import json
+import threading
+import time
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+
+BENCH_USER_EMAIL = 'benchmark@slotgame.local'
+BENCH_USER_BALANCE = Decimal('10000000.00')
+
+ENDPOINT_PATHS = {
+    'sync': {'spin': '/slot/spin/', 'balance': '/slot/balance/'},
+    'async': {'spin': '/slot/async/spin/', 'balance': '/slot/async/balance/'},
+}
+
+
+def _bench_token():
+    user, _ = User.objects.get_or_create(email=BENCH_USER_EMAIL, defaults={'phone': 'benchmark'})
+    User.objects.filter(pk=user.pk).update(balance=BENCH_USER_BALANCE)
+    return str(AccessToken.for_user(user))
+
+
+def _worker(url, method, body, headers, count, latencies, errors):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            connection.request(method, parts.path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            ok = False
+        latencies.append(time.perf_counter() - started)
+        if not ok:
+            errors.append(1)
+    connection.close()
+
+
+def run_benchmark(url, method, body, headers, requests, concurrency):
+    """
+    Sends requests HTTP requests from concurrency threads, each over its own keep-alive connection.
+    Returns throughput (successful requests per second), latency percentiles (ms) and the error count.
+    """
+    latencies = []
+    errors = []
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    threads = [
+        threading.Thread(target=_worker, args=(url, method, body, headers, count, latencies, errors))
+        for count in per_thread if count
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "throughput": (len(latencies) - len(errors)) / elapsed,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the sync (DRF, WSGI) and async (ASGI) spin/balance endpoints. "
+        "Run both servers under the same memory limit (see docker-compose.bench.yml)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', help="Base URL of the WSGI server, e.g. http://web:8000")
+        parser.add_argument('--async-url', help="Base URL of the ASGI server, e.g. http://web-async:8001")
+        parser.add_argument('--endpoint', choices=('spin', 'balance'), default='spin')
+        parser.add_argument('--slot-machine-id', type=int, help="Slot machine to spin (required for spin)")
+        parser.add_argument('--bet', default='1.00', help="Bet per line")
+        parser.add_argument('--lines', type=int, default=1)
+        parser.add_argument('--requests', type=int, default=5000, help="Measured requests per server")
+        parser.add_argument('--warmup', type=int, default=200, help="Unmeasured requests per server before measuring")
+        parser.add_argument('--concurrency', type=int, default=64, help="Concurrent client connections")
+        parser.add_argument('--token', help="JWT access token (default: a benchmark user is created in this database)")
+
+    def handle(self, *args, **options):
+        targets = [(path, options[f'{path}_url']) for path in ('sync', 'async') if options[f'{path}_url']]
+        if not targets:
+            raise CommandError("Pass --sync-url and/or --async-url")
+        if options['endpoint'] == 'spin' and options['slot_machine_id'] is None:
+            raise CommandError("--slot-machine-id is required for the spin endpoint")
+
+        token = options['token'] or _bench_token()
+        headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        if options['endpoint'] == 'spin':
+            method = 'POST'
+            body = json.dumps({
+                "slot_machine_id": options['slot_machine_id'],
+                "bet_amount": options['bet'],
+                "lines": options['lines'],
+            })
+        else:
+            method, body = 'GET', None
+
+        self.stdout.write(f"{options['endpoint']}: {options['requests']} requests, concurrency {options['concurrency']}")
+        for path, base_url in targets:
+            url = base_url.rstrip('/') + ENDPOINT_PATHS[path][options['endpoint']]
+            if options['warmup']:
+                run_benchmark(url, method, body, headers, options['warmup'], options['concurrency'])
+            result = run_benchmark(url, method, body, headers, options['requests'], options['concurrency'])
+            self.stdout.write(
+                f"{path:>5} {url}: {result['throughput']:.1f} req/s, "
+                f"p50 {result['p50']:.1f} ms, p95 {result['p95']:.1f} ms, p99 {result['p99']:.1f} ms, "
+                f"{result['errors']} errors"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from slot.sessions import close_idle_game_sessions, idle_timeout
+
+
+class Command(BaseCommand):
+    help = "Close open game sessions that have had no spins for longer than GAME_SESSION_IDLE_TIMEOUT"
+
+    def handle(self, *args, **options):
+        closed = close_idle_game_sessions()
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} sessions idle for more than {idle_timeout()}"))
@@ -0,0 +1,114 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from slot.compiled import get_compiled_machine
+from slot.models import SlotMachine, Spin, Symbol
+from slot.spin_codec import decode_grid, encode_grid, get_or_create_symbol_table
+
+
+def legacy_columns(spin_result, rows, cols):
+    """
+    Приводит устаревший spin_result к списку колонок с именами символов или возвращает None,
+    если форма не совпадает с сеткой автомата rows x cols.
+
+    Встречаются два формата: плоский список имен построчно (исходный generate_spin,
+    random.choices(k=rows * cols)) и список колонок (спины, записанные до компактного формата).
+    """
+    if not isinstance(spin_result, list):
+        return None
+    if len(spin_result) == rows * cols and all(isinstance(name, str) for name in spin_result):
+        return [[spin_result[row * cols + col] for row in range(rows)] for col in range(cols)]
+    if len(spin_result) == cols and all(
+        isinstance(column, list) and len(column) == rows and all(isinstance(name, str) for name in column)
+        for column in spin_result
+    ):
+        return spin_result
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert legacy JSON Spin.spin_result rows to the compact binary grid, in primary key order. "
+        "Rows that do not match the machine's grid or do not decode back to the original are skipped and reported"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows converted per transaction")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many rows")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        limit = options['limit']
+        machines = {}
+        processed = converted = skipped = 0
+        last_id = 0
+
+        while limit is None or processed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - processed)
+            # keyset pagination: every batch is an index range scan, no OFFSET
+            spins = list(
+                Spin.objects.filter(id__gt=last_id, grid__isnull=True, spin_result__isnull=False)
+                .order_by('id')
+                .values('id', 'spin_result', 'game_session__slot_machine_id')[:size]
+            )
+            if not spins:
+                break
+
+            updates = []
+            for spin in spins:
+                slot_machine_id = spin['game_session__slot_machine_id']
+                if slot_machine_id not in machines:
+                    machines[slot_machine_id] = self._machine(slot_machine_id)
+                machine = machines[slot_machine_id]
+
+                columns = legacy_columns(spin['spin_result'], machine['rows'], machine['cols'])
+                if columns is None:
+                    skipped += 1
+                    self.stderr.write(self.style.WARNING(
+                        f"Skipped spin {spin['id']}: result does not match the {machine['rows']}x{machine['cols']} "
+                        f"grid of slot machine {slot_machine_id}"
+                    ))
+                    continue
+
+                # символы, которых уже нет у автомата, дописываются в конец таблицы
+                unknown = sorted({name for column in columns for name in column} - set(machine['names']))
+                if unknown:
+                    machine['names'] = machine['names'] + unknown
+                names = machine['names']
+
+                table = get_or_create_symbol_table(slot_machine_id, names, machine['rows'], machine['cols'])
+                index = {name: position for position, name in enumerate(names)}
+                grid = encode_grid(
+                    [index[columns[col][row]] for row in range(machine['rows']) for col in range(machine['cols'])],
+                    len(names),
+                )
+                # исходный JSON удаляется только если компактная сетка раскодируется в тот же результат
+                if decode_grid(grid, table) != columns:
+                    skipped += 1
+                    self.stderr.write(self.style.WARNING(f"Skipped spin {spin['id']}: grid does not decode back to the result"))
+                    continue
+                updates.append(Spin(id=spin['id'], grid=grid, symbol_table=table, spin_result=None))
+
+            if updates:
+                with transaction.atomic():
+                    Spin.objects.bulk_update(updates, ['grid', 'symbol_table', 'spin_result'])
+
+            processed += len(spins)
+            converted += len(updates)
+            last_id = spins[-1]['id']
+            self.stdout.write(f"Converted {converted} spins, skipped {skipped} (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {converted} spins converted, {skipped} skipped"))
+
+    def _machine(self, slot_machine_id):
+        shape = SlotMachine.objects.filter(id=slot_machine_id).values('rows', 'cols').get()
+        return {"names": self._current_symbols(slot_machine_id), **shape}
+
+    def _current_symbols(self, slot_machine_id):
+        try:
+            return list(get_compiled_machine(slot_machine_id).symbol_names)
+        except ValueError:
+            # автомат с некорректной конфигурацией: берем имена символов напрямую
+            return list(
+                Symbol.objects.filter(slot_machine_id=slot_machine_id).order_by('id').values_list('symbol_name', flat=True)
+            )
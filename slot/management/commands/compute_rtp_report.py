@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from slot.models import RTPReport, SlotMachine
+from slot.reports import compute_rtp_report, get_machine_fingerprint
+
+
+class Command(BaseCommand):
+    help = "Compute RTP reports for the current configuration of slot machines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slot_machine_ids', nargs='*', type=int, help="Slot machine ids (default: all)")
+        parser.add_argument('--spins', type=int, default=None, help="Number of simulated spins")
+        parser.add_argument('--workers', type=int, default=None, help="Number of simulation processes")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for a reproducible report")
+        parser.add_argument('--force', action='store_true', help="Recompute reports that are already done")
+
+    def handle(self, *args, **options):
+        slot_machines = SlotMachine.objects.order_by('id')
+        if options['slot_machine_ids']:
+            slot_machines = slot_machines.filter(id__in=options['slot_machine_ids'])
+            missing = set(options['slot_machine_ids']) - set(slot_machines.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Slot machines not found: {sorted(missing)}")
+
+        for slot_machine in slot_machines:
+            report, _ = RTPReport.objects.get_or_create(
+                slot_machine=slot_machine,
+                config_fingerprint=get_machine_fingerprint(slot_machine),
+            )
+            if report.status == RTPReport.STATUS_DONE and not options['force']:
+                self.stdout.write(f"{slot_machine}: report {report.id} is up to date (RTP {report.rtp:.4f}%)")
+                continue
+
+            report = compute_rtp_report(
+                report, total_spins=options['spins'], workers=options['workers'], seed=options['seed']
+            )
+            if report.status == RTPReport.STATUS_DONE:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{slot_machine}: report {report.id} RTP {report.rtp:.4f}%, volatility {report.volatility:.4f}"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"{slot_machine}: report {report.id} {report.status} {report.error}"))
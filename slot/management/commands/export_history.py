@@ -0,0 +1,49 @@
+import sys
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from slot.archive import KINDS
+from slot.exports import DEFAULT_CHUNK_SIZE, FORMAT_NDJSON, FORMATS, export_history
+
+
+def _parse_date(value, option):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"{option} must be a date in YYYY-MM-DD format")
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = "Stream Spin or Transaction history of a user (or all users) and a date range as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=KINDS, help="What to export")
+        users = parser.add_mutually_exclusive_group(required=True)
+        users.add_argument('--user', type=int, help="Export this user id")
+        users.add_argument('--all-users', action='store_true', help="Export every user's history")
+        parser.add_argument('--from', dest='start', help="From this UTC date inclusive (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end', help="Until this UTC date exclusive (YYYY-MM-DD)")
+        parser.add_argument('--format', choices=FORMATS, default=FORMAT_NDJSON, help="Output format")
+        parser.add_argument('--gzip', action='store_true', help="Compress the output with gzip")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per database round trip")
+        parser.add_argument('--output', help="Output file (default: stdout)")
+
+    def handle(self, *args, **options):
+        start = _parse_date(options['start'], '--from') if options['start'] else None
+        end = _parse_date(options['end'], '--to') if options['end'] else None
+
+        chunks = export_history(
+            options['kind'], options['format'], user_id=options['user'], all_users=options['all_users'], start=start, end=end,
+            compress=options['gzip'], chunk_size=options['chunk_size'],
+        )
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
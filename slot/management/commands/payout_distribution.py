@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from slot.models import SlotMachine
+from slot.services import calculate_payout_distribution
+
+
+class Command(BaseCommand):
+    help = "Simulate a slot machine and print its payout distribution (hit frequency, histogram, tail quantiles)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slot_machine_id', type=int)
+        parser.add_argument('--spins', type=int, default=1000000, help="Number of simulated spins")
+        parser.add_argument('--workers', type=int, default=1, help="Number of simulation processes")
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for a reproducible run")
+
+    def handle(self, *args, **options):
+        slot_machine = SlotMachine.objects.filter(id=options['slot_machine_id']).first()
+        if slot_machine is None:
+            raise CommandError(f"Slot machine {options['slot_machine_id']} not found")
+
+        distribution = calculate_payout_distribution(
+            slot_machine, total_spins=options['spins'], seed=options['seed'], workers=options['workers']
+        )
+
+        self.stdout.write(f"{slot_machine}: {distribution['spins']} spins")
+        self.stdout.write(f"  RTP:           {distribution['rtp']:.4f}%")
+        self.stdout.write(f"  Volatility:    {distribution['volatility']:.4f}")
+        self.stdout.write(f"  Hit frequency: {distribution['hit_frequency']:.4%}")
+        self.stdout.write(f"  Max win:       {distribution['max_win']:g}x")
+        for name, value in distribution['quantiles'].items():
+            self.stdout.write(f"  {name + ':':<15}{value:g}x")
+        self.stdout.write("  Histogram (win multiple: spins):")
+        for label, count in distribution['histogram'].items():
+            self.stdout.write(f"    {label:>10}: {count}")
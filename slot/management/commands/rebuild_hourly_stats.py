@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from slot.rollups import DEFAULT_BATCH_SIZE, rebuild_hourly_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-machine hourly statistics from the spins stored in the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Spins per transaction")
+
+    def handle(self, *args, **options):
+        processed = rebuild_hourly_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt hourly statistics from {processed} spins"))
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from slot.compiled import get_compiled_machine
+from slot.models import SlotMachine
+from slot.solver import DEFAULT_RESTARTS, DEFAULT_WEIGHT_RANGE, apply_candidate, solve_rtp
+
+
+class Command(BaseCommand):
+    help = "Search symbol weights and/or payouts that bring a slot machine to a target RTP"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slot_machine_id', type=int)
+        parser.add_argument('--target-rtp', type=float, required=True, help="Target RTP in percent")
+        parser.add_argument('--min-volatility', type=float, default=None)
+        parser.add_argument('--max-volatility', type=float, default=None)
+        parser.add_argument('--min-hit-frequency', type=float, default=None, help="Share of winning spins, 0..1")
+        parser.add_argument('--max-hit-frequency', type=float, default=None, help="Share of winning spins, 0..1")
+        parser.add_argument('--no-weights', action='store_true', help="Keep symbol weights unchanged")
+        parser.add_argument('--payouts', action='store_true', help="Also tune symbol payouts")
+        parser.add_argument('--min-weight', type=int, default=DEFAULT_WEIGHT_RANGE[0])
+        parser.add_argument('--max-weight', type=int, default=DEFAULT_WEIGHT_RANGE[1])
+        parser.add_argument('--payout-step', type=Decimal, default=Decimal(1))
+        parser.add_argument('--candidates', type=int, default=5, help="Number of configurations to print")
+        parser.add_argument('--restarts', type=int, default=DEFAULT_RESTARTS)
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for a reproducible search")
+        parser.add_argument('--apply', action='store_true', help="Write the best configuration to the symbols")
+
+    def handle(self, *args, **options):
+        slot_machine = SlotMachine.objects.filter(id=options['slot_machine_id']).first()
+        if slot_machine is None:
+            raise CommandError(f"Slot machine {options['slot_machine_id']} not found")
+
+        try:
+            candidates = solve_rtp(
+                get_compiled_machine(slot_machine.id),
+                options['target_rtp'],
+                volatility_range=(options['min_volatility'], options['max_volatility']),
+                hit_frequency_range=(options['min_hit_frequency'], options['max_hit_frequency']),
+                tune_weights=not options['no_weights'],
+                tune_payouts=options['payouts'],
+                weight_range=(options['min_weight'], options['max_weight']),
+                payout_step=options['payout_step'],
+                candidates=options['candidates'],
+                restarts=options['restarts'],
+                seed=options['seed'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for rank, candidate in enumerate(candidates, start=1):
+            self.stdout.write(
+                f"#{rank}: RTP {candidate['rtp']:.4f}%, volatility {candidate['volatility']:.4f}, "
+                f"hit frequency {candidate['hit_frequency']:.4%}, distance {candidate['distance']:.6f}"
+            )
+            for name, weight in candidate['weights'].items():
+                self.stdout.write(f"    {name:<20} weight {weight:>5}  payout {candidate['payouts'][name]}")
+
+        if options['apply'] and candidates:
+            apply_candidate(slot_machine, candidates[0])
+            self.stdout.write(self.style.SUCCESS(f"{slot_machine}: applied configuration #1"))
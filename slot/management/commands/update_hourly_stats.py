@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from slot.rollups import DEFAULT_BATCH_SIZE, update_hourly_stats
+
+
+class Command(BaseCommand):
+    help = "Add spins recorded since the last run to the per-machine hourly statistics"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Spins per transaction")
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling for new spins")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = update_hourly_stats(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Added {processed} spins to hourly statistics"))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
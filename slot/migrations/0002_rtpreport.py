@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-17 19:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RTPReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('config_fingerprint', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed'), ('STALE', 'Stale')], default='PENDING', max_length=10)),
+                ('total_spins', models.BigIntegerField(blank=True, null=True)),
+                ('rtp', models.FloatField(blank=True, null=True)),
+                ('volatility', models.FloatField(blank=True, null=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('slot_machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rtp_reports', to='slot.slotmachine')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('slot_machine', 'config_fingerprint'), name='unique_rtp_report_per_config')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0002_rtpreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='symbol',
+            name='payouts_by_length',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0003_symbol_payouts_by_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slotmachine',
+            name='evaluation_mode',
+            field=models.CharField(choices=[('LINES', 'Paylines'), ('WAYS', 'Ways to win')], default='LINES', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-17 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0004_slotmachine_evaluation_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReelStrip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reel_number', models.IntegerField()),
+                ('symbols', models.JSONField()),
+                ('slot_machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reel_strips', to='slot.slotmachine')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0005_reelstrip'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slotmachine',
+            name='use_lookup_table',
+            field=models.BooleanField(default=False),
+        ),
+    ]
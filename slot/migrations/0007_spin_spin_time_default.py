@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 20:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0006_slotmachine_use_lookup_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='spin',
+            name='spin_time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-17 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0007_spin_spin_time_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spin',
+            name='grid',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='spin',
+            name='spin_result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SymbolTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64)),
+                ('rows', models.IntegerField()),
+                ('cols', models.IntegerField()),
+                ('symbols', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('slot_machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='symbol_tables', to='slot.slotmachine')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='spin',
+            name='symbol_table',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='slot.symboltable'),
+        ),
+        migrations.AddConstraint(
+            model_name='symboltable',
+            constraint=models.UniqueConstraint(fields=('slot_machine', 'digest'), name='unique_symbol_table_per_machine'),
+        ),
+    ]
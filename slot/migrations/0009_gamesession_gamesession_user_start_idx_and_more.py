@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-17 20:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0008_compact_spin_result'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamesession',
+            index=models.Index(fields=['user', 'session_start', 'id'], name='gamesession_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spin',
+            index=models.Index(fields=['game_session', 'spin_time', 'id'], name='spin_session_time_idx'),
+        ),
+    ]
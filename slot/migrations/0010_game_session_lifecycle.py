@@ -0,0 +1,63 @@
+# Generated by Django 5.1 on 2026-10-17 20:19
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_session_totals(apps, schema_editor):
+    """
+    Заполняет итоги сессий по существующим спинам и закрывает все открытые сессии,
+    чтобы старые сессии (по одной на спин) не нарушали ограничение одной открытой сессии.
+    """
+    GameSession = apps.get_model('slot', 'GameSession')
+    Spin = apps.get_model('slot', 'Spin')
+
+    spins = Spin.objects.filter(game_session=OuterRef('pk')).order_by().values('game_session')
+    GameSession.objects.update(
+        spin_count=Coalesce(Subquery(spins.annotate(count=Count('id')).values('count')), 0),
+        total_winnings=Coalesce(
+            Subquery(spins.annotate(total=Sum('winnings')).values('total')), F('total_winnings'),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ),
+        last_activity=Coalesce(Subquery(spins.annotate(last=Max('spin_time')).values('last')), F('session_start')),
+    )
+    GameSession.objects.update(total_wagered=F('bet_amount') * F('lines') * F('spin_count'))
+    GameSession.objects.filter(session_end__isnull=True).update(session_end=F('last_activity'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0009_gamesession_gamesession_user_start_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='last_activity',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='spin_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='total_wagered',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_session_totals, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='gamesession',
+            index=models.Index(condition=models.Q(('session_end__isnull', True)), fields=['last_activity'], name='gamesession_open_activity_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='gamesession',
+            constraint=models.UniqueConstraint(condition=models.Q(('session_end__isnull', True)), fields=('user', 'slot_machine', 'bet_amount', 'lines'), name='unique_open_game_session'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-17 20:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0010_game_session_lifecycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_spin_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MachineHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('spin_count', models.BigIntegerField(default=0)),
+                ('winning_spins', models.BigIntegerField(default=0)),
+                ('total_wagered', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_winnings', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('slot_machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='slot.slotmachine')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('slot_machine', 'hour'), name='unique_machine_hourly_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0011_machine_hourly_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rtpreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
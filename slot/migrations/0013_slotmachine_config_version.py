@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 20:37
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0012_rtpreport_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slotmachine',
+            name='config_version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
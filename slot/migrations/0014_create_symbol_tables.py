@@ -0,0 +1,35 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+
+def create_symbol_tables(apps, schema_editor):
+    """
+    Создает таблицы символов для текущей конфигурации существующих автоматов: раньше их
+    создавал compile_machine при первом спине, теперь - сигналы при изменении автомата.
+    Ключ - как в slot.spin_codec.symbol_table_digest.
+    """
+    SlotMachine = apps.get_model('slot', 'SlotMachine')
+    Symbol = apps.get_model('slot', 'Symbol')
+    SymbolTable = apps.get_model('slot', 'SymbolTable')
+
+    for machine in SlotMachine.objects.all():
+        names = list(Symbol.objects.filter(slot_machine=machine).order_by('id').values_list('symbol_name', flat=True))
+        payload = json.dumps([names, machine.rows, machine.cols], separators=(',', ':')).encode()
+        SymbolTable.objects.get_or_create(
+            slot_machine=machine,
+            digest=hashlib.sha256(payload).hexdigest(),
+            defaults={"rows": machine.rows, "cols": machine.cols, "symbols": names},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot', '0013_slotmachine_config_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_symbol_tables, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,29 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 from authentication.models import User
 
 class SlotMachine(models.Model):
+    MODE_LINES = 'LINES'
+    MODE_WAYS = 'WAYS'
+    EVALUATION_MODES = (
+        (MODE_LINES, 'Paylines'),
+        (MODE_WAYS, 'Ways to win'),
+    )
+
     name = models.CharField(max_length=255)
     rows = models.IntegerField()
     cols = models.IntegerField()
     max_lines = models.IntegerField()
+    evaluation_mode = models.CharField(max_length=10, choices=EVALUATION_MODES, default=MODE_LINES)
+    use_lookup_table = models.BooleanField(default=False)
     min_bet = models.DecimalField(max_digits=10, decimal_places=2)
     max_bet = models.DecimalField(max_digits=10, decimal_places=2)
+    # Версия конфигурации (автомат, символы, линии, ленты): новый случайный токен при каждом
+    # изменении, по нему процессы узнают, что скомпилированный автомат устарел (см. slot.compiled).
+    # Токен, а не счетчик: save() объекта, прочитанного до изменения, не вернет старую версию.
+    config_version = models.UUIDField(default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -20,6 +35,9 @@ class Symbol(models.Model):
     symbol_name = models.CharField(max_length=100)
     symbol_count = models.IntegerField()
     payout = models.DecimalField(max_digits=10, decimal_places=2)
+    # Выплаты за серию с начала линии, например {"3": 5, "4": 20, "5": 100}.
+    # Если не заданы, символ платит payout только за полностью совпавшую линию.
+    payouts_by_length = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.symbol_name} (Payout: {self.payout}, Frequency: {self.symbol_count})"
@@ -30,21 +48,82 @@ class GameSession(models.Model):
     bet_amount = models.DecimalField(max_digits=10, decimal_places=2)
     lines = models.IntegerField()
     total_winnings = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # Итоги сессии обновляются F()-инкрементами на каждом спине (см. slot.sessions)
+    spin_count = models.IntegerField(default=0)
+    total_wagered = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     session_start = models.DateTimeField(default=timezone.now)
+    last_activity = models.DateTimeField(default=timezone.now)
+    # None - сессия открыта; закрывается явно или по простою (GAME_SESSION_IDLE_TIMEOUT)
     session_end = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # история сессий игрока с курсорной пагинацией по (session_start, id)
+            models.Index(fields=['user', 'session_start', 'id'], name='gamesession_user_start_idx'),
+            # поиск простаивающих открытых сессий
+            models.Index(fields=['last_activity'], condition=models.Q(session_end__isnull=True),
+                         name='gamesession_open_activity_idx'),
+        ]
+        constraints = [
+            # не больше одной открытой сессии на игрока, автомат, ставку и линии
+            models.UniqueConstraint(fields=['user', 'slot_machine', 'bet_amount', 'lines'],
+                                    condition=models.Q(session_end__isnull=True),
+                                    name='unique_open_game_session'),
+        ]
+
     def __str__(self):
         return f"Session {self.id} by {self.user}"
 
 
+class SymbolTable(models.Model):
+    """
+    Неизменяемая таблица символов, по которой декодируются компактные результаты спинов:
+    индекс в сетке спина - позиция имени символа в symbols.
+    """
+    slot_machine = models.ForeignKey(SlotMachine, on_delete=models.CASCADE, related_name="symbol_tables")
+    digest = models.CharField(max_length=64)
+    rows = models.IntegerField()
+    cols = models.IntegerField()
+    symbols = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['slot_machine', 'digest'], name='unique_symbol_table_per_machine'),
+        ]
+
+    def __str__(self):
+        return f"Symbol table {self.id} for {self.slot_machine_id}"
+
+
 class Spin(models.Model):
     game_session = models.ForeignKey(GameSession, on_delete=models.CASCADE)
-    spin_result = models.JSONField()
+    # Устаревший формат: плоский список имен символов построчно или список колонок с именами.
+    # Новые спины хранятся в grid, старые переводит команда compact_spin_results.
+    spin_result = models.JSONField(null=True, blank=True)
+    # Компактный формат: индексы символов построчно, по байту на ячейку (по два, если символов больше 256)
+    grid = models.BinaryField(null=True, blank=True)
+    symbol_table = models.ForeignKey(SymbolTable, on_delete=models.PROTECT, null=True, blank=True)
     winnings = models.DecimalField(max_digits=10, decimal_places=2)
-    spin_time = models.DateTimeField(auto_now_add=True)
+    # время спина задается при создании объекта, а не при вставке (запись может быть отложенной)
+    spin_time = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # спины сессии с курсорной пагинацией по (spin_time, id)
+            models.Index(fields=['game_session', 'spin_time', 'id'], name='spin_session_time_idx'),
+        ]
 
     def __str__(self):
         return f"Spin {self.id} in Session {self.game_session.id}"
+
+    @property
+    def result(self):
+        """Результат спина в виде списка колонок с именами символов (для любого формата хранения)."""
+        if self.grid is None:
+            return self.spin_result
+        from .spin_codec import decode_grid, get_symbol_table
+        return decode_grid(self.grid, get_symbol_table(self.symbol_table_id))
     
 
 class Payline(models.Model):
@@ -53,4 +132,87 @@ class Payline(models.Model):
     coordinates = models.JSONField()
 
     def __str__(self):
-        return f"Payline {self.line_number} for {self.slot_machine.name}"
\ No newline at end of file
+        return f"Payline {self.line_number} for {self.slot_machine.name}"
+
+
+class ReelStrip(models.Model):
+    slot_machine = models.ForeignKey(SlotMachine, on_delete=models.CASCADE, related_name="reel_strips")
+    reel_number = models.IntegerField()
+    # Упорядоченная лента символов барабана: список имен символов (Symbol.symbol_name)
+    symbols = models.JSONField()
+
+    def __str__(self):
+        return f"Reel {self.reel_number} for {self.slot_machine.name}"
+
+
+class RTPReport(models.Model):
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_STALE = 'STALE'
+    STATUSES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_STALE, 'Stale'),
+    )
+
+    slot_machine = models.ForeignKey(SlotMachine, on_delete=models.CASCADE, related_name="rtp_reports")
+    config_fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    total_spins = models.BigIntegerField(null=True, blank=True)
+    rtp = models.FloatField(null=True, blank=True)
+    volatility = models.FloatField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['slot_machine', 'config_fingerprint'], name='unique_rtp_report_per_config'),
+        ]
+
+    def __str__(self):
+        return f"RTP report {self.id} for {self.slot_machine.name} ({self.status})"
+
+
+class MachineHourlyStats(models.Model):
+    """
+    Почасовые итоги игры на автомате (час - начало часа в UTC). Строки обновляются
+    инкрементально заданием slot.rollups по новым спинам, поэтому статистика за
+    любой период - сумма по часам, без агрегатов по Spin.
+    """
+    slot_machine = models.ForeignKey(SlotMachine, on_delete=models.CASCADE, related_name="hourly_stats")
+    hour = models.DateTimeField()
+    spin_count = models.BigIntegerField(default=0)
+    winning_spins = models.BigIntegerField(default=0)
+    total_wagered = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_winnings = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['slot_machine', 'hour'], name='unique_machine_hourly_stats'),
+        ]
+
+    @property
+    def ggr(self):
+        return self.total_wagered - self.total_winnings
+
+    def __str__(self):
+        return f"{self.slot_machine_id} @ {self.hour:%Y-%m-%d %H:00}: {self.spin_count} spins"
+
+
+class RollupWatermark(models.Model):
+    """
+    Позиция задания агрегации: id последнего спина, уже учтенного в почасовых итогах.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_spin_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_spin_id}"
@@ -0,0 +1,80 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по (время, id) от новых записей к старым.
+
+    Курсор - время и id последней записи страницы, следующая страница - это
+    WHERE (time, id) < (курсор) ORDER BY time DESC, id DESC LIMIT n, то есть один
+    проход по составному индексу (владелец, time, id). В отличие от OFFSET,
+    страница N стоит столько же, сколько первая.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, time_field):
+        self.time_field = time_field
+        self.next_cursor = None
+        self.request = None
+
+    def encode_cursor(self, instance):
+        position = [getattr(instance, self.time_field).isoformat(), instance.pk]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            time_value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position = parse_datetime(time_value)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position is None or not isinstance(pk, int):
+            raise NotFound(self.invalid_cursor_message)
+        return position, pk
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.time_field}__lt': position}) | Q(**{self.time_field: position, 'pk__lt': pk})
+            )
+
+        rows = list(queryset.order_by(f'-{self.time_field}', '-pk')[:page_size + 1])
+        self.next_cursor = self.encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_next_link(self):
+        url = self.request.build_absolute_uri()
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "results": data,
+        })
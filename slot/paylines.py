@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+import numpy as np
+
+
+def build_pay_table(paylines, rows, cols, payouts, payouts_by_length):
+    """
+    Таблица выплат по линиям в центах: pay_table[line, symbol, run] - выплата линии
+    при ставке 1, если первые run ячеек линии (слева направо) заняты символом symbol.
+
+    - payouts: базовая выплата символа (Symbol.payout) - платится только за полную линию.
+    - payouts_by_length: для каждого символа None или словарь {длина серии: выплата}
+      (Symbol.payouts_by_length) - выплаты за "3/4/5 в ряд" с начала линии.
+
+    Линии, выходящие за пределы сетки, никогда не выигрывают.
+    """
+    max_length = max((len(line) for line in paylines), default=0)
+    pay_table = np.zeros((len(paylines), len(payouts), max_length + 1), dtype=np.int64)
+
+    for line_index, line in enumerate(paylines):
+        if not all(0 <= row < rows and 0 <= col < cols for row, col in line):
+            continue
+        length = len(line)
+        for symbol_index, (payout, by_length) in enumerate(zip(payouts, payouts_by_length)):
+            if by_length:
+                for run, run_payout in by_length.items():
+                    if 0 < int(run) <= length:
+                        pay_table[line_index, symbol_index, int(run)] = round(Decimal(str(run_payout)) * 100)
+            else:
+                pay_table[line_index, symbol_index, length] = round(payout * 100)
+
+    return pay_table
+
+
+class PaylineEvaluator:
+    """
+    Скомпилированный оценщик линий выплат для целочисленной сетки.
+
+    Сетка - массив индексов символов длиной rows * cols, ячейка (row, col) лежит
+    по индексу row * cols + col. Линии компилируются один раз в плоские массивы
+    индексов ячеек, после чего все линии (и целый блок сеток) оцениваются одним
+    векторизованным проходом: для каждой линии считается длина серии первого
+    символа слева направо и выплата берется из pay_table.
+    """
+
+    def __init__(self, paylines, rows, cols, pay_table):
+        self.rows = rows
+        self.cols = cols
+        self.pay_table = pay_table
+
+        max_length = pay_table.shape[2] - 1
+        self.line_lengths = np.array([len(line) for line in paylines], dtype=np.int64)
+        self.line_cells = np.zeros((len(paylines), max_length), dtype=np.int64)
+        self.line_mask = np.zeros((len(paylines), max_length), dtype=bool)
+        for line_index, line in enumerate(paylines):
+            for position, (row, col) in enumerate(line):
+                if 0 <= row < rows and 0 <= col < cols:
+                    self.line_cells[line_index, position] = row * cols + col
+                    self.line_mask[line_index, position] = True
+        self.line_indices = np.arange(len(paylines))
+
+        for array in (self.pay_table, self.line_lengths, self.line_cells, self.line_mask, self.line_indices):
+            array.setflags(write=False)
+
+    @classmethod
+    def from_config(cls, paylines, rows, cols, payouts, payouts_by_length):
+        return cls(paylines, rows, cols, build_pay_table(paylines, rows, cols, payouts, payouts_by_length))
+
+    @property
+    def lines(self):
+        return len(self.line_lengths)
+
+    def for_lines(self, lines):
+        """Оценщик только для первых lines линий (линии, на которые сделана ставка)."""
+        evaluator = PaylineEvaluator.__new__(PaylineEvaluator)
+        evaluator.rows = self.rows
+        evaluator.cols = self.cols
+        evaluator.pay_table = self.pay_table[:lines]
+        evaluator.line_lengths = self.line_lengths[:lines]
+        evaluator.line_cells = self.line_cells[:lines]
+        evaluator.line_mask = self.line_mask[:lines]
+        evaluator.line_indices = self.line_indices[:lines]
+        return evaluator
+
+    def run_lengths(self, grids):
+        """
+        Для блока сеток (N x cells) возвращает первый символ каждой линии и длину
+        его серии слева направо - два массива (N x lines).
+        """
+        symbols = grids[:, self.line_cells]
+        first = symbols[:, :, 0]
+        matched = (symbols == first[:, :, np.newaxis]) & self.line_mask
+        return first, np.cumprod(matched, axis=2).sum(axis=2)
+
+    def line_wins(self, grids):
+        """Выигрыш каждой линии в центах при ставке 1 на линию - массив (N x lines)."""
+        first, runs = self.run_lengths(grids)
+        return self.pay_table[self.line_indices, first, runs]
+
+    def symbol_wins(self, grids):
+        """Суммарный выигрыш линий по первому символу линии в центах - массив (N x символы)."""
+        first, runs = self.run_lengths(grids)
+        wins = self.pay_table[self.line_indices, first, runs]
+        totals = np.zeros((len(grids), self.pay_table.shape[1]), dtype=np.int64)
+        spins = np.arange(len(grids))
+        for line_index in range(self.lines):
+            totals[spins, first[:, line_index]] += wins[:, line_index]
+        return totals
+
+    def win_counts(self, grids, weights=None):
+        """
+        Количество выигрышей каждой линии каждым символом в блоке сеток - массив
+        (lines x символы). Если заданы weights, каждая сетка считается с весом weights[i].
+        """
+        first, runs = self.run_lengths(grids)
+        won = self.pay_table[self.line_indices, first, runs] > 0
+        if weights is not None:
+            won = won * weights[:, np.newaxis]
+        counts = np.zeros(self.pay_table.shape[:2], dtype=won.dtype if weights is not None else np.int64)
+        np.add.at(counts, (np.broadcast_to(self.line_indices, first.shape), first), won)
+        return counts
+
+    def score(self, grid):
+        """Выигрыш каждой линии в центах для одной сетки."""
+        return self.line_wins(np.asarray(grid)[np.newaxis, :])[0]
+
+    def score_batch(self, grids):
+        """Суммарный выигрыш в центах для каждой сетки блока при ставке 1 на линию."""
+        return self.line_wins(grids).sum(axis=1)
+
+    def spin_returns(self, grids):
+        """Выигрыш каждой сетки блока на единицу общей ставки (ставка 1 на каждую линию)."""
+        return self.score_batch(grids) / (100 * self.lines)
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Payline, ReelStrip, RTPReport, SlotMachine, Symbol
+from .services import calculate_payout_distribution
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_report_settings():
+    """
+    Настройки расчета отчетов RTP (можно переопределить в settings.py).
+    """
+    return {
+        "total_spins": getattr(settings, 'RTP_REPORT_TOTAL_SPINS', 1000000),
+        "workers": getattr(settings, 'RTP_REPORT_WORKERS', 1),
+        "seed": getattr(settings, 'RTP_REPORT_SEED', None),
+        "running_timeout": getattr(settings, 'RTP_REPORT_RUNNING_TIMEOUT', 60 * 60),
+    }
+
+
+def get_machine_fingerprint(slot_machine):
+    """
+    Отпечаток конфигурации игрового автомата: размеры сетки, количество линий,
+    символы и линии выплат. Любое изменение, влияющее на RTP, меняет отпечаток.
+    """
+    symbols = Symbol.objects.filter(slot_machine=slot_machine).order_by('id')
+    paylines = Payline.objects.filter(slot_machine=slot_machine).order_by('line_number', 'id')
+    reel_strips = ReelStrip.objects.filter(slot_machine=slot_machine).order_by('reel_number', 'id')
+
+    config = {
+        "rows": slot_machine.rows,
+        "cols": slot_machine.cols,
+        "max_lines": slot_machine.max_lines,
+        "evaluation_mode": slot_machine.evaluation_mode,
+        "symbols": [
+            [symbol.symbol_name, symbol.symbol_count, str(symbol.payout), symbol.payouts_by_length]
+            for symbol in symbols
+        ],
+        "paylines": [
+            [payline.line_number, payline.coordinates]
+            for payline in paylines
+        ],
+        "reel_strips": [
+            [reel_strip.reel_number, reel_strip.symbols]
+            for reel_strip in reel_strips
+        ],
+    }
+    encoded = json.dumps(config, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def get_latest_report(slot_machine):
+    """
+    Возвращает готовый отчет для текущей конфигурации автомата или None.
+    """
+    return RTPReport.objects.filter(
+        slot_machine=slot_machine,
+        config_fingerprint=get_machine_fingerprint(slot_machine),
+        status=RTPReport.STATUS_DONE,
+    ).first()
+
+
+# Статусы, из которых отчет может вернуться в очередь
+REQUEUE_STATUSES = (RTPReport.STATUS_FAILED, RTPReport.STATUS_STALE, RTPReport.STATUS_RUNNING)
+
+
+def _requeue_report(report):
+    """
+    Возвращает отчет в PENDING, если он упал, устарел (конфигурация автомата вернулась
+    к его отпечатку) или висит в RUNNING дольше RTP_REPORT_RUNNING_TIMEOUT (воркер умер).
+
+    Условный update по текущему статусу гарантирует, что расчет запустит только один
+    процесс. Возвращает True, если отчет поставлен в очередь этим вызовом.
+    """
+    reports = RTPReport.objects.filter(id=report.id, status=report.status)
+    if report.status == RTPReport.STATUS_RUNNING:
+        timeout = timedelta(seconds=get_report_settings()["running_timeout"])
+        reports = reports.filter(updated_at__lt=timezone.now() - timeout)
+
+    if not reports.update(status=RTPReport.STATUS_PENDING, error='', finished_at=None, updated_at=timezone.now()):
+        report.refresh_from_db(fields=['status', 'error', 'finished_at', 'updated_at'])
+        return False
+
+    report.refresh_from_db(fields=['status', 'error', 'finished_at', 'updated_at'])
+    return True
+
+
+def schedule_rtp_report(slot_machine):
+    """
+    Ставит в очередь расчет отчета для текущей конфигурации автомата.
+
+    Если отчет для этой конфигурации уже есть (в очереди, считается или готов),
+    новый расчет не запускается и возвращается существующий отчет.
+    Упавший, устаревший и зависший отчеты перезапускаются (см. _requeue_report).
+    """
+    report, created = RTPReport.objects.get_or_create(
+        slot_machine=slot_machine,
+        config_fingerprint=get_machine_fingerprint(slot_machine),
+    )
+
+    if not created and report.status in REQUEUE_STATUSES:
+        created = _requeue_report(report)
+
+    if created:
+        # запускаем расчет только после коммита, чтобы воркер увидел запись отчета
+        report_id = report.id
+        transaction.on_commit(lambda: _get_executor().submit(_run_rtp_report, report_id))
+
+    return report
+
+
+def compute_rtp_report(report, total_spins=None, workers=None, seed=None):
+    """
+    Синхронно считает отчет RTP и сохраняет результат.
+
+    Если конфигурация автомата изменилась после постановки отчета в очередь,
+    отчет помечается как устаревший и не считается.
+    """
+    report_settings = get_report_settings()
+    total_spins = total_spins or report_settings["total_spins"]
+    workers = workers or report_settings["workers"]
+    seed = seed if seed is not None else report_settings["seed"]
+
+    slot_machine = report.slot_machine
+    if get_machine_fingerprint(slot_machine) != report.config_fingerprint:
+        report.status = RTPReport.STATUS_STALE
+        report.finished_at = timezone.now()
+        report.save(update_fields=['status', 'finished_at', 'updated_at'])
+        return report
+
+    report.status = RTPReport.STATUS_RUNNING
+    report.save(update_fields=['status', 'updated_at'])
+
+    try:
+        distribution = calculate_payout_distribution(
+            slot_machine, total_spins=total_spins, seed=seed, workers=workers
+        )
+    except Exception as exc:
+        logger.exception("RTP report %s failed", report.id)
+        report.status = RTPReport.STATUS_FAILED
+        report.error = str(exc)
+        report.finished_at = timezone.now()
+        report.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        return report
+
+    report.status = RTPReport.STATUS_DONE
+    report.total_spins = distribution["spins"]
+    report.rtp = distribution["rtp"]
+    report.volatility = distribution["volatility"]
+    report.details = {
+        key: distribution[key] for key in ("hit_frequency", "max_win", "quantiles", "histogram")
+    }
+    report.finished_at = timezone.now()
+    report.save(update_fields=['status', 'total_spins', 'rtp', 'volatility', 'details', 'finished_at', 'updated_at'])
+    return report
+
+
+def _get_executor():
+    """
+    Фоновый воркер создается лениво, чтобы не переживать fork воркеров gunicorn.
+    Отчеты считаются по одному, чтобы не конкурировать за CPU с обработкой запросов.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rtp-report')
+        return _executor
+
+
+def _run_rtp_report(report_id):
+    close_old_connections()
+    try:
+        report = RTPReport.objects.select_related('slot_machine').filter(id=report_id).first()
+        if report is not None and report.status == RTPReport.STATUS_PENDING:
+            compute_rtp_report(report)
+    except Exception:
+        logger.exception("RTP report %s worker crashed", report_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_rtp_report_for_machine_id(slot_machine_id):
+    """
+    Ставит отчет в очередь по id автомата (для обработчиков сигналов).
+    """
+    slot_machine = SlotMachine.objects.filter(id=slot_machine_id).first()
+    if slot_machine is not None:
+        schedule_rtp_report(slot_machine)
@@ -0,0 +1,189 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Min, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import MachineHourlyStats, RollupWatermark, Spin
+
+HOURLY_STATS = 'machine_hourly_stats'
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_SETTLE_SECONDS = 5
+
+
+def settle_delay():
+    """
+    Задержка, после которой спин попадает в итоги (settings.ROLLUP_SETTLE_SECONDS).
+    За это время успевают закоммититься транзакции с меньшими id и строки из
+    отложенной записи (write-behind), иначе водяной знак мог бы их перепрыгнуть.
+    """
+    return timedelta(seconds=getattr(settings, 'ROLLUP_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS))
+
+
+def hour_start(value):
+    """Начало часа (UTC), в который попадает момент value."""
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _settled_upper_id(last_id, batch_size, cutoff):
+    """
+    Id последнего спина непрерывного префикса (после last_id, не больше batch_size),
+    в котором все спины старше cutoff; None - обрабатывать нечего.
+    """
+    upper = None
+    spins = Spin.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'spin_time')[:batch_size]
+    for spin_id, spin_time in spins:
+        if spin_time >= cutoff:
+            break
+        upper = spin_id
+    return upper
+
+
+def _hourly_totals(last_id, upper_id):
+    """Итоги спинов с id в (last_id, upper_id] по автоматам и часам - один GROUP BY по диапазону ключа."""
+    wagered = ExpressionWrapper(
+        F('game_session__bet_amount') * F('game_session__lines'),
+        output_field=DecimalField(max_digits=16, decimal_places=2),
+    )
+    return (
+        Spin.objects.filter(id__gt=last_id, id__lte=upper_id)
+        .annotate(hour=TruncHour('spin_time', tzinfo=dt_timezone.utc))
+        .values('game_session__slot_machine_id', 'hour')
+        .annotate(
+            spins=Count('id'),
+            wins=Count('id', filter=Q(winnings__gt=0)),
+            wagered=Sum(wagered),
+            won=Sum('winnings'),
+        )
+        .order_by()
+    )
+
+
+def _add_totals(totals):
+    for row in totals:
+        key = {"slot_machine_id": row['game_session__slot_machine_id'], "hour": row['hour']}
+        increments = {
+            "spin_count": row['spins'],
+            "winning_spins": row['wins'],
+            "total_wagered": row['wagered'],
+            "total_winnings": row['won'],
+        }
+        updated = MachineHourlyStats.objects.filter(**key).update(
+            **{field: F(field) + value for field, value in increments.items()}
+        )
+        if not updated:
+            MachineHourlyStats.objects.create(**key, **increments)
+
+
+def _lock_watermark():
+    watermark, _ = RollupWatermark.objects.get_or_create(name=HOURLY_STATS)
+    return RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+
+
+def update_hourly_stats(batch_size=DEFAULT_BATCH_SIZE, max_batches=None, now=None):
+    """
+    Добавляет в почасовые итоги новые спины после водяного знака.
+
+    Спины читаются пачками по первичному ключу, каждая пачка - отдельная транзакция:
+    GROUP BY по диапазону id, F()-инкременты строк MachineHourlyStats и сдвиг
+    водяного знака. Строка водяного знака блокируется, поэтому одновременно
+    запущенные задания не учтут спины дважды. Спины моложе settle_delay() ждут
+    следующего запуска.
+
+    Возвращает количество учтенных спинов.
+    """
+    cutoff = (now or timezone.now()) - settle_delay()
+    processed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            watermark = _lock_watermark()
+            upper_id = _settled_upper_id(watermark.last_spin_id, batch_size, cutoff)
+            if upper_id is None:
+                return processed
+
+            totals = list(_hourly_totals(watermark.last_spin_id, upper_id))
+            _add_totals(totals)
+            watermark.last_spin_id = upper_id
+            watermark.save(update_fields=['last_spin_id', 'updated_at'])
+
+        processed += sum(row['spins'] for row in totals)
+        batches += 1
+    return processed
+
+
+def rebuild_hourly_stats(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Пересобирает почасовые итоги из спинов в базе потоково, пачками по batch_size.
+
+    Итоги удаляются начиная с часа самого старого спина в базе, а более ранние часы
+    (спины которых уже перенесены в архив) сохраняются. Водяной знак сбрасывается,
+    и итоги заполняются заново тем же заданием, что и при обычном обновлении.
+    Возвращает количество учтенных спинов.
+    """
+    with transaction.atomic():
+        watermark = _lock_watermark()
+        first_spin_time = Spin.objects.aggregate(first=Min('spin_time'))['first']
+        if first_spin_time is not None:
+            MachineHourlyStats.objects.filter(hour__gte=hour_start(first_spin_time)).delete()
+        watermark.last_spin_id = 0
+        watermark.save(update_fields=['last_spin_id', 'updated_at'])
+
+    return update_hourly_stats(batch_size=batch_size)
+
+
+def machine_stats(slot_machine_id, start=None, end=None, hourly=False):
+    """
+    Статистика автомата за часы [start, end) по почасовым итогам: количество спинов,
+    сумма ставок (handle), выигрыши, GGR, наблюдаемый RTP и частота выигрышей.
+    Границы округляются вниз до часа; стоимость запроса зависит только от числа часов.
+    """
+    rows = MachineHourlyStats.objects.filter(slot_machine_id=slot_machine_id)
+    if start is not None:
+        rows = rows.filter(hour__gte=hour_start(start))
+    if end is not None:
+        rows = rows.filter(hour__lt=hour_start(end))
+
+    totals = rows.aggregate(
+        spin_count=Sum('spin_count'),
+        winning_spins=Sum('winning_spins'),
+        handle=Sum('total_wagered'),
+        total_winnings=Sum('total_winnings'),
+    )
+    spin_count = totals['spin_count'] or 0
+    handle = totals['handle'] or 0
+    winnings = totals['total_winnings'] or 0
+    stats = {
+        "spin_count": spin_count,
+        "winning_spins": totals['winning_spins'] or 0,
+        "handle": handle,
+        "total_winnings": winnings,
+        "ggr": handle - winnings,
+        "observed_rtp": float(winnings / handle * 100) if handle else None,
+        "hit_frequency": (totals['winning_spins'] or 0) / spin_count if spin_count else None,
+    }
+    if hourly:
+        stats["hours"] = [
+            {
+                "hour": row.hour,
+                "spin_count": row.spin_count,
+                "handle": row.total_wagered,
+                "total_winnings": row.total_winnings,
+                "ggr": row.ggr,
+            }
+            for row in rows.order_by('hour')
+        ]
+    return stats
+
+
+def rolled_up_spin_id():
+    """Id последнего спина, уже учтенного в почасовых итогах (0 - итоги еще не строились)."""
+    return RollupWatermark.objects.filter(name=HOURLY_STATS).values_list('last_spin_id', flat=True).first() or 0
+
+
+def stats_updated_at():
+    """Время последнего сдвига водяного знака почасовых итогов (None - итоги еще не строились)."""
+    return RollupWatermark.objects.filter(name=HOURLY_STATS).values_list('updated_at', flat=True).first()
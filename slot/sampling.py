@@ -0,0 +1,150 @@
+import random
+
+import numpy as np
+
+
+class AliasSampler:
+    """
+    Взвешенный выбор индексов символов за O(1) по алиас-таблице Уолкера (алгоритм Vose).
+
+    Таблица строится один раз по весам символов (целым любого размера или дробным),
+    после чего каждая ячейка - это одно случайное число: его целая часть выбирает
+    столбец таблицы, а дробная - сам столбец или его "алиас". В отличие от пула
+    символов, размер таблицы равен числу символов, а не сумме весов.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) == 0:
+            raise ValueError("Slot machine has no symbols configured")
+        if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+            raise ValueError("Symbol weights must be finite and non-negative")
+        if weights.sum() <= 0:
+            raise ValueError("Slot machine symbols have no positive symbol_count")
+
+        size = len(weights)
+        self.probabilities = weights / weights.sum()
+        scaled = self.probabilities * size
+
+        prob = np.ones(size)
+        alias = np.arange(size)
+        small = [index for index in range(size) if scaled[index] < 1]
+        large = [index for index in range(size) if scaled[index] >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # оставшиеся столбцы заполнены целиком (с точностью до округления)
+
+        self.size = size
+        self.prob = prob
+        self.alias = alias
+        for array in (self.probabilities, self.prob, self.alias):
+            array.setflags(write=False)
+
+        # копии таблицы в виде списков для быстрых одиночных спинов без numpy
+        self._prob_list = prob.tolist()
+        self._alias_list = alias.tolist()
+
+    def sample(self, k, random=random.random):
+        """Выбирает k индексов символов (для одного спина), random - источник чисел в [0, 1)."""
+        size = self.size
+        prob = self._prob_list
+        alias = self._alias_list
+        result = []
+        for _ in range(k):
+            x = random() * size
+            column = min(int(x), size - 1)
+            result.append(column if x - column < prob[column] else alias[column])
+        return result
+
+    def draw(self, rng, shape):
+        """Векторизованно выбирает массив индексов символов формы shape (для симуляции)."""
+        x = rng.random(shape) * self.size
+        columns = np.minimum(x.astype(np.int64), self.size - 1)
+        return np.where(x - columns < self.prob[columns], columns, self.alias[columns])
+
+    def __len__(self):
+        return self.size
+
+
+class CellGridSampler:
+    """
+    Модель независимых ячеек: каждая из rows * cols ячеек выбирается по весам символов.
+    Сетки возвращаются построчно: ячейка (row, col) лежит по индексу row * cols + col.
+    """
+
+    def __init__(self, sampler, rows, cols):
+        self.sampler = sampler
+        self.rows = rows
+        self.cols = cols
+
+    @property
+    def probabilities(self):
+        return self.sampler.probabilities
+
+    def sample_grid(self, random=random.random):
+        """Одна сетка (список индексов символов) для живого спина."""
+        return self.sampler.sample(self.rows * self.cols, random)
+
+    def draw_grids(self, rng, size):
+        """Блок из size сеток (size x cells) для симуляции."""
+        return self.sampler.draw(rng, (size, self.rows * self.cols))
+
+
+class ReelStripSampler:
+    """
+    Модель ленточных барабанов: у каждого барабана (колонки) есть упорядоченная лента
+    символов, спин выбирает одну позицию остановки на барабан и читает окно из rows
+    символов подряд (по кругу). Это cols случайных чисел на спин вместо rows * cols.
+
+    windows[col][stop] - индексы символов окна барабана col при остановке stop,
+    они строятся один раз при компиляции автомата.
+    """
+
+    def __init__(self, strips, rows):
+        if not strips or any(len(strip) == 0 for strip in strips):
+            raise ValueError("Every reel strip must contain at least one symbol")
+
+        self.rows = rows
+        self.cols = len(strips)
+        self.strip_lengths = np.array([len(strip) for strip in strips], dtype=np.int64)
+        self.windows = tuple(
+            np.array([[strip[(stop + row) % len(strip)] for row in range(rows)] for stop in range(len(strip))],
+                     dtype=np.int64)
+            for strip in strips
+        )
+        self._window_lists = tuple(window.tolist() for window in self.windows)
+        self.strip_lengths.setflags(write=False)
+        for window in self.windows:
+            window.setflags(write=False)
+
+    @property
+    def combinations(self):
+        """Количество всех комбинаций остановок барабанов."""
+        return int(np.prod(self.strip_lengths, dtype=object))
+
+    def sample_stops(self, random=random.random):
+        """Позиции остановки барабанов для одного спина."""
+        return [min(int(random() * length), length - 1) for length in self.strip_lengths.tolist()]
+
+    def grid_from_stops(self, stops):
+        """Сетка (построчный список индексов символов) по позициям остановки барабанов."""
+        columns = [self._window_lists[col][stop] for col, stop in enumerate(stops)]
+        return [columns[col][row] for row in range(self.rows) for col in range(self.cols)]
+
+    def sample_grid(self, random=random.random):
+        return self.grid_from_stops(self.sample_stops(random))
+
+    def grids_from_stops(self, stops):
+        """Блок сеток (N x cells) по массиву позиций остановки (N x cols)."""
+        grids = np.empty((len(stops), self.rows, self.cols), dtype=np.int64)
+        for col, window in enumerate(self.windows):
+            grids[:, :, col] = window[stops[:, col]]
+        return grids.reshape(len(stops), self.rows * self.cols)
+
+    def draw_grids(self, rng, size):
+        stops = rng.integers(0, self.strip_lengths, size=(size, self.cols))
+        return self.grids_from_stops(stops)
@@ -1,13 +1,84 @@
+from decimal import Decimal
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import GameSession, Spin
-from authentication.models import User
+from .services import MAX_AUTOPLAY_SPINS
+from authentication.models import Transaction, User
 
 class BetSerializer(serializers.Serializer):
     slot_machine_id = serializers.IntegerField()
     bet_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     lines = serializers.IntegerField()
 
+class AutoplaySerializer(BetSerializer):
+    spins = serializers.IntegerField(min_value=1, max_value=MAX_AUTOPLAY_SPINS)
+    stop_loss = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False, allow_null=True, default=None)
+    stop_win = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False, allow_null=True, default=None)
+
 class SpinResultSerializer(serializers.ModelSerializer):
+    # decodes both the compact grid and legacy JSON results
+    spin_result = serializers.JSONField(source='result', read_only=True)
+
     class Meta:
         model = Spin
         fields = ['spin_result', 'winnings', 'spin_time']
+
+def _decimal_string(value, decimal_places):
+    # DecimalField.to_representation with COERCE_DECIMAL_TO_STRING
+    return f"{value.quantize(Decimal(1).scaleb(-decimal_places)):f}"
+
+def _datetime_string(value):
+    # DateTimeField.to_representation with the ISO 8601 format
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+_WINNINGS_DECIMAL_PLACES = Spin._meta.get_field('winnings').decimal_places
+
+def spin_result_data(spin):
+    """
+    SpinResultSerializer(spin).data without DRF field machinery, for the spin hot path.
+    Must stay schema-equivalent to SpinResultSerializer.
+    """
+    return {
+        "spin_result": spin.result,
+        "winnings": _decimal_string(Decimal(spin.winnings), _WINNINGS_DECIMAL_PLACES),
+        "spin_time": _datetime_string(spin.spin_time),
+    }
+
+def money_data(value):
+    """Money amount rendered like the winnings field of SpinResultSerializer, e.g. "12.50"."""
+    return _decimal_string(Decimal(value), _WINNINGS_DECIMAL_PLACES)
+
+class RTPSolverSerializer(serializers.Serializer):
+    target_rtp = serializers.FloatField(min_value=0)
+    min_volatility = serializers.FloatField(required=False, allow_null=True, default=None)
+    max_volatility = serializers.FloatField(required=False, allow_null=True, default=None)
+    min_hit_frequency = serializers.FloatField(required=False, allow_null=True, default=None, min_value=0, max_value=1)
+    max_hit_frequency = serializers.FloatField(required=False, allow_null=True, default=None, min_value=0, max_value=1)
+    tune_weights = serializers.BooleanField(required=False, default=True)
+    tune_payouts = serializers.BooleanField(required=False, default=False)
+    min_weight = serializers.IntegerField(required=False, default=1, min_value=1)
+    max_weight = serializers.IntegerField(required=False, default=100, min_value=1)
+    payout_step = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, default=1)
+    candidates = serializers.IntegerField(required=False, default=5, min_value=1, max_value=50)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+class TransactionHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = ['id', 'transaction_type', 'amount', 'balance_after', 'created_at']
+
+class GameSessionHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GameSession
+        fields = ['id', 'slot_machine', 'bet_amount', 'lines', 'spin_count', 'total_wagered', 'total_winnings',
+                  'session_start', 'last_activity', 'session_end']
+
+class SpinHistorySerializer(SpinResultSerializer):
+    class Meta(SpinResultSerializer.Meta):
+        fields = ['id'] + SpinResultSerializer.Meta.fields
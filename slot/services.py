@@ -1,15 +1,28 @@
 import random
 from decimal import Decimal
-from .models import GameSession, Spin, Payline, Symbol, SlotMachine
-from authentication.models import Transaction
-
-DEFAULT_PAYLINES = [
-    [(0, 0), (0, 1), (0, 2)],  # Line 1: Top row
-    [(1, 0), (1, 1), (1, 2)],  # Line 2: Middle row
-    [(2, 0), (2, 1), (2, 2)],  # Line 3: Bottom row
-    [(0, 0), (1, 1), (2, 2)],  # Line 4: Diagonal from top left to bottom right
-    [(0, 2), (1, 1), (2, 0)],  # Line 5: Diagonal from top right to bottom left
-]
+from statistics import NormalDist
+from django.db import transaction
+from django.utils import timezone
+from .models import Spin, SlotMachine
+from .compiled import as_compiled_machine, get_compiled_machine
+from .distribution import PayoutDistribution
+from .sessions import add_session_spins, open_game_session
+from .exact import exact_line_moments, exact_lookup_moments, exact_reel_moments, exact_ways_moments
+from .spin_codec import encode_grid
+from .simulation import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MIN_HITS,
+    RunningStats,
+    confidence_half_width,
+    simulate_payouts,
+    simulate_until_precision,
+)
+from authentication import wallet
+from shared.django.write_behind import get_ledger
+from authentication.models import Transaction, User
+
+# Максимальное количество спинов в одном запросе автоигры
+MAX_AUTOPLAY_SPINS = 1000
 
 symbol_count = {
     "Apple": 2,
@@ -49,207 +62,427 @@ def get_paylines(slot_machine, lines):
     """
     Получает линии выплат для игрового автомата. Если есть кастомные линии в базе, 
     использует их, иначе возвращает стандартные линии.
+    Линии берутся из скомпилированного автомата, без запросов к базе.
     """
-    custom_paylines = Payline.objects.filter(slot_machine=slot_machine).order_by('line_number')[:lines]
-
-    if custom_paylines.exists():
-        # Если есть кастомные линии, преобразуем их из JSON в список координат
-        paylines = [
-            [(coord['row'], coord['col']) for coord in payline.coordinates]
-            for payline in custom_paylines
-        ]
-    else:
-        # Если кастомных линий нет, используем стандартные
-        paylines = DEFAULT_PAYLINES[:lines]
-
-    return paylines
+    return list(as_compiled_machine(slot_machine).paylines[:lines])
 
 
 def calculate_winnings(columns, slot_machine, lines, bet):
     """
     Рассчитывает выигрыш по результатам спина и выбранным линиям выплат.
+    columns - список колонок, columns[col][row] - символ в ячейке (row, col).
+    Линии оцениваются скомпилированным PaylineEvaluator, включая серии "3/4/5 в ряд",
+    или таблицей всех исходов, если она включена для автомата.
+    В режиме "ways" выигрыш считается WaysEvaluator, а вместо номеров линий
+    возвращаются имена выигравших символов.
     """
-    paylines = get_paylines(slot_machine, lines)
-    winnings = Decimal(0)
-    winning_lines = []
+    machine = as_compiled_machine(slot_machine)
 
-    # Проверяем каждую линию на совпадение символов
-    for line_index, line in enumerate(paylines):
-        symbol = columns[line[0][1]][line[0][0]]  # Первый символ в линии
-        for position in line:
-            row, col = position
-            if col >= len(columns) or row >= len(columns[col]) or columns[col][row] != symbol:
-                break
-        else:
-            # Если все символы на линии совпали, начисляем выигрыш
-            winnings += Decimal(symbol_value.get(symbol, 0)) * Decimal(bet)
-            winning_lines.append(line_index + 1)
-
-    return winnings, winning_lines
+    # кодируем сетку индексами символов: ячейка (row, col) -> row * cols + col
+    grid = [
+        machine.symbol_index[columns[col][row]]
+        for row in range(machine.rows)
+        for col in range(machine.cols)
+    ]
+    return _grid_winnings(machine, grid, lines, bet)
 
 
-def create_game_session(user, slot_machine, bet_amount, lines):
+def _grid_winnings(machine, grid, lines, bet):
     """
-    Создает новую игровую сессию для пользователя и сохраняет её в базе данных.
+    Выигрыш и выигравшие линии для сетки индексов символов (построчно).
     """
-    session = GameSession.objects.create(
-        user=user,
-        slot_machine=slot_machine,
-        bet_amount=bet_amount,
-        lines=lines
-    )
-    return session
+    line_wins = machine.spin_evaluator.for_lines(lines).score(grid)
+
+    # выплаты в таблице хранятся в центах при ставке 1 на линию
+    winnings = Decimal(int(line_wins.sum())) / 100 * Decimal(bet)
+    if machine.evaluation_mode == SlotMachine.MODE_WAYS:
+        winning_lines = [machine.symbol_names[index] for index in line_wins.nonzero()[0].tolist()]
+    else:
+        winning_lines = [line_index + 1 for line_index in line_wins.nonzero()[0].tolist()]
+
+    return winnings, winning_lines
 
 
 def record_spin(session, result, winnings):
     """
     Сохраняет информацию о спине (результате вращения) в базе данных.
+    Результат хранится компактно: индексы символов в байтах и ссылка на таблицу символов.
     """
-    spin = Spin.objects.create(
+    machine = get_compiled_machine(session.slot_machine_id)
+    grid = [
+        machine.symbol_index[result[col][row]]
+        for row in range(machine.rows)
+        for col in range(machine.cols)
+    ]
+    spin = Spin(
         game_session=session,
-        spin_result=result,
+        grid=encode_grid(grid, len(machine.symbol_names)),
+        symbol_table_id=machine.symbol_table_id,
         winnings=winnings
     )
+    # в режиме отложенной записи спин вставляется фоновым потоком после коммита
+    ledger = get_ledger()
+    if ledger is None:
+        spin.save(force_insert=True)
+    else:
+        ledger.add_on_commit(spin)
     return spin
 
 
 def create_bet_transaction(user, amount):
     """
-    Сохраняет транзакцию ставки и обновляет баланс пользователя.
+    Списывает ставку с баланса пользователя и сохраняет транзакцию ставки.
+    Баланс меняется одним условным UPDATE; если средств не хватает,
+    бросает InsufficientFunds.
     """
-    new_balance = user.balance - amount
-    Transaction.objects.create(
-        user=user,
-        transaction_type='BET',
-        amount=amount,
-        balance_after=new_balance
-    )
-    user.balance = new_balance
-    user.save()
+    return wallet.debit(user, amount, 'BET')
 
 
 def create_win_transaction(user, amount):
     """
-    Сохраняет транзакцию выигрыша и обновляет баланс пользователя.
+    Зачисляет выигрыш на баланс пользователя и сохраняет транзакцию выигрыша.
     """
-    new_balance = user.balance + amount
-    Transaction.objects.create(
-        user=user,
-        transaction_type='WIN',
-        amount=amount,
-        balance_after=new_balance
-    )
-    user.balance = new_balance
-    user.save()
+    return wallet.credit(user, amount, 'WIN')
 
 
 def generate_spin(slot_machine):
     """
     Генерирует случайный результат спина для игрового автомата, используя символы из базы данных.
+    Возвращает список колонок, каждая колонка - список из rows символов.
+    """
+    machine = as_compiled_machine(slot_machine)
+
+    # генерируем случайную сетку: по алиас-таблице символов или по остановкам лент барабанов
+    return _grid_to_columns(machine, machine.grid_sampler.sample_grid())
+
+
+def _grid_to_columns(machine, grid):
+    """
+    Переводит построчную сетку индексов символов в список колонок с именами символов.
+    """
+    names = machine.symbol_names
+    return [
+        [names[grid[row * machine.cols + col]] for row in range(machine.rows)]
+        for col in range(machine.cols)
+    ]
+
+
+def bet_error(slot_machine, bet_amount, lines):
+    """
+    Проверяет ставку и количество линий для автомата; возвращает текст ошибки или None.
+    """
+    if bet_amount < slot_machine.min_bet or bet_amount > slot_machine.max_bet:
+        return f"Bet must be between {slot_machine.min_bet} and {slot_machine.max_bet}"
+    if lines > slot_machine.available_lines or lines < 1:
+        return f"Invalid number of lines, max is {slot_machine.available_lines}"
+    return None
+
+
+def play_spin(user, slot_machine, bet_amount, lines):
     """
-    symbols = Symbol.objects.filter(slot_machine=slot_machine)
-    symbol_pool = []
+    Один спин одной транзакцией: списание ставки, открытая сессия игрока, генерация
+    и оценка сетки, запись спина, зачисление выигрыша и итоги сессии.
 
-    # пул символов на основе их частоты
-    for symbol in symbols:
-        symbol_pool.extend([symbol.symbol_name] * symbol.symbol_count)
+    Если средств не хватает, бросает InsufficientFunds (ничего не записывается).
+    return - (спин, выигравшие линии, сессия); user.balance - баланс после спина.
+    """
+    machine = as_compiled_machine(slot_machine)
+    total_bet = bet_amount * lines
+    with transaction.atomic():
+        create_bet_transaction(user, total_bet)
+        session = open_game_session(user, machine, bet_amount, lines)
+
+        spin_result = generate_spin(machine)
+        winnings, winning_lines = calculate_winnings(spin_result, machine, lines, bet_amount)
+        spin = record_spin(session, spin_result, winnings)
+
+        if winnings > 0:
+            create_win_transaction(user, winnings)
+        add_session_spins(session, total_bet, winnings)
+    return spin, winning_lines, session
 
-    # генерируем случайный результат спина
-    spin_result = random.choices(symbol_pool, k=slot_machine.rows * slot_machine.cols)
-    return spin_result
 
+def play_autoplay(user, slot_machine, bet_amount, lines, spins, stop_loss=None, stop_win=None):
+    """
+    Автоигра: до spins спинов подряд одной транзакцией базы данных.
+
+    Баланс пользователя блокируется (select_for_update) и списывается/пополняется
+    в памяти, а в базу записывается один раз в конце пачки. Спины и транзакции
+    BET/WIN (с balance_after после каждого спина) сохраняются через bulk_create,
+    а итоги открытой сессии игрока обновляются одним F()-инкрементом - несколько
+    запросов на всю пачку вместо 6-8 на каждый спин.
+
+    Автоигра останавливается раньше, если:
+    - не хватает средств на следующий спин ("insufficient_funds");
+    - чистый проигрыш пачки достиг stop_loss ("stop_loss");
+    - чистый выигрыш пачки достиг stop_win ("stop_win").
+
+    return - словарь:
+    - results: список [сетка, выигрыш, выигравшие линии] по каждому спину, где
+      сетка - индексы символов построчно (ячейка (row, col) -> row * cols + col).
+    - spins_played, total_bet, total_winnings, balance, stop_reason.
+    """
+    machine = as_compiled_machine(slot_machine)
+    total_bet = bet_amount * lines
+    zero = Decimal('0.00')
+
+    with transaction.atomic():
+        balance = User.objects.select_for_update().values_list('balance', flat=True).get(pk=user.pk)
+
+        spin_time = timezone.now()
+        results = []
+        records = []
+        ledger = []
+        wagered = won = zero
+        stop_reason = None
+        for _ in range(spins):
+            if balance < total_bet:
+                stop_reason = "insufficient_funds"
+                break
+
+            balance -= total_bet
+            ledger.append(Transaction(user_id=user.pk, transaction_type='BET', amount=total_bet,
+                                      balance_after=balance))
+
+            grid = machine.grid_sampler.sample_grid()
+            winnings, winning_lines = _grid_winnings(machine, grid, lines, bet_amount)
+            if winnings > 0:
+                balance += winnings
+                ledger.append(Transaction(user_id=user.pk, transaction_type='WIN', amount=winnings,
+                                          balance_after=balance))
+
+            wagered += total_bet
+            won += winnings
+            records.append(Spin(grid=encode_grid(grid, len(machine.symbol_names)),
+                                symbol_table_id=machine.symbol_table_id, winnings=winnings))
+            results.append([grid, winnings, winning_lines])
+
+            if stop_loss is not None and wagered - won >= stop_loss:
+                stop_reason = "stop_loss"
+                break
+            if stop_win is not None and won - wagered >= stop_win:
+                stop_reason = "stop_win"
+                break
 
-def calculate_rtp_and_volatility(slot_machine, total_spins=100000):
+        if results:
+            session = open_game_session(user, machine, bet_amount, lines, now=spin_time)
+            add_session_spins(session, wagered, won, spins=len(results))
+            for record in records:
+                record.game_session = session
+            Spin.objects.bulk_create(records)
+            Transaction.objects.bulk_create(ledger)
+            User.objects.filter(pk=user.pk).update(balance=balance)
+
+    user.balance = balance
+    return {
+        "results": results,
+        "spins_played": len(results),
+        "total_bet": wagered,
+        "total_winnings": won,
+        "balance": balance,
+        "stop_reason": stop_reason or "completed",
+    }
+
+
+def _prepare_simulation(slot_machine, lines=None):
+    """
+    Возвращает скомпилированный автомат, генератор сеток и оценщик линий
+    для lines линий (по умолчанию - все доступные линии автомата).
+    """
+    machine = as_compiled_machine(slot_machine)
+    lines = lines or machine.available_lines
+    if lines < 1 or lines > machine.evaluator.lines:
+        raise ValueError(f"Invalid number of lines, max is {machine.evaluator.lines}")
+    return machine, machine.grid_sampler, machine.spin_evaluator.for_lines(lines)
+
+
+def calculate_rtp_and_volatility(slot_machine, total_spins=100000, *, engine='vectorized',
+                                 batch_size=DEFAULT_BATCH_SIZE, seed=None, workers=1, lines=None):
     """
     Рассчет RTP и волатильность игрового автомата.
 
     Параметры:
     - slot_machine: объект SlotMachine, для которого будет проведен расчет.
     - total_spins: количество симулируемых спинов (по умолчанию 100000).
+    - engine: 'vectorized' (по умолчанию) - блочная симуляция на numpy, которая
+      справляется с десятками миллионов спинов за секунды; 'python' - эталонный
+      поспиновый цикл через generate_spin/calculate_winnings для сверки результатов.
+    - batch_size: размер блока спинов для векторизованного движка.
+    - seed: зерно генератора случайных чисел для воспроизводимого результата.
+    - workers: количество процессов для векторизованного движка; при одном и том же
+      seed результат не зависит от количества процессов.
+    - lines: количество линий, на которые делается ставка (по умолчанию - все доступные).
 
     return:
     - rtp: процент возврата игроку, который показывает, сколько денег автомат возвращает в среднем.
-    - volatility: волатильность, показывающая, насколько сильно варьируются выплаты.
-    """
-    # получаем все символы, которые используются в данном игровом автомате
-    symbols = Symbol.objects.filter(slot_machine=slot_machine)
-    
-    # переменные для накопления общей суммы выигрышей и ставок
-    total_wins = Decimal(0)
-    total_bets = Decimal(0)
-    
-    # список для хранения всех выигрышей, что будет использован для расчета волатильности
-    payout_distribution = []
-
-    #  пул символов, где каждый символ повторяется в зависимости от его частоты (symbol_count)
-    symbol_pool = []
-    for symbol in symbols:
-        symbol_pool.extend([symbol.symbol_name] * symbol.symbol_count)
-
-    # старт симуляции заданного total_spins
-    for _ in range(total_spins):
-        # Задаем фиксированную ставку $1 на каждый спин
-        bet_amount = Decimal(1)
-        
-        # генерим результат спина
-        spin_result = random.choices(symbol_pool, k=slot_machine.rows * slot_machine.cols)
-
-        # рассчет выигрыша спина на основе результата
-        winnings = calculate_winnings_from_simulation(spin_result, symbols, bet_amount)
-
-        # добавляем выигрыш к общей сумме выигрышей
-        total_wins += winnings
-        
-        # добавляем ставку к общей сумме ставок
-        total_bets += bet_amount
-        
-        # сохраняем размер выигрыша для дальнейшего анализа волатильности
-        payout_distribution.append(winnings)
-
-    # считааем RTP как отношение общей суммы выигрышей к общей сумме ставок
-    # это показывает процент возврата игроку
-    rtp = (total_wins / total_bets) * 100
-
-    # рассчет среднего выигрыша за спин (average_payout)
-    average_payout = total_wins / total_spins
-    
-    # рассчитываем дисперсию (variance) — отклонение всех выплат от среднего значения
-    # она показывает насколько сильно выплаты варируются вокруг среднего значения
-    variance = sum((x - average_payout) ** 2 for x in payout_distribution) / total_spins
-    
+    - volatility: волатильность, показывающая, насколько сильно варьируются выплаты
+      (на единицу общей ставки).
+    """
+    if total_spins <= 0:
+        raise ValueError("total_spins must be positive")
+
+    machine, sampler, evaluator = _prepare_simulation(slot_machine, lines)
+
+    if engine == 'vectorized':
+        stats = simulate_payouts(
+            sampler, evaluator, total_spins, batch_size=batch_size, seed=seed, workers=workers
+        )
+    elif engine == 'python':
+        stats = _simulate_payouts_python(machine, evaluator.lines, total_spins, seed)
+    else:
+        raise ValueError(f"Unknown simulation engine: {engine}")
+
+    # ставка - 1 на каждую линию, выигрыш считается на единицу общей ставки,
+    # поэтому RTP - это средний выигрыш за спин в процентах
+    rtp = stats.mean * 100
+
     # волатильность — это квадратный корень из дисперсии, который показывает, насколько сильно выплаты отличаются от среднего значения
-    volatility = variance ** 0.5
+    volatility = stats.variance ** 0.5
 
     return rtp, volatility
 
 
-def calculate_winnings_from_simulation(spin_result, symbols, bet_amount):
+def calculate_payout_distribution(slot_machine, total_spins=1000000, batch_size=DEFAULT_BATCH_SIZE,
+                                  seed=None, workers=1, lines=None):
     """
-    Рассчитывает выигрыш на основе результата симуляции спина. 
-    Используется простая механика "match-3", когда нужно совпадение 
-    трех одинаковых символов подряд для получения выигрыша.
+    Симуляция распределения выигрышей игрового автомата с ограниченной памятью.
 
-    Параметры:
-    - spin_result: список символов, полученных в результате спина
-    - symbols: все символы и их выплаты
-    - bet_amount: ставка, сделанная на спин
+    Параметры - как в calculate_rtp_and_volatility.
 
-    Возвращает:
-    - winnings: итоговый выигрыш на основе совпадений символов.
+    return - словарь (выигрыши в множителях общей ставки):
+    - spins, rtp, volatility: количество спинов, RTP и волатильность.
+    - hit_frequency: доля спинов с выигрышем.
+    - max_win: максимальный наблюдавшийся выигрыш.
+    - quantiles: квантили выигрыша p99, p99.9 и p99.99.
+    - histogram: количество спинов в каждой корзине множителя выигрыша.
     """
-    # словарь, где каждому символу сопоставляем его выплату
-    symbol_to_payout = {symbol.symbol_name: symbol.payout for symbol in symbols}
+    if total_spins <= 0:
+        raise ValueError("total_spins must be positive")
 
-    # переменнаю для накопления выигрыша
-    winnings = Decimal(0)
+    _, sampler, evaluator = _prepare_simulation(slot_machine, lines)
+
+    distribution = simulate_payouts(
+        sampler, evaluator, total_spins,
+        batch_size=batch_size, seed=seed, workers=workers, accumulator=PayoutDistribution
+    )
+    return distribution.summary()
 
-    # Проходим по результатам спина, проверяя каждые три символа на совпадение
-    for i in range(0, len(spin_result), 3):
-        # проверяем, совпадают ли три символа подряд
-        if spin_result[i:i + 3].count(spin_result[i]) == 3:
-            # если все три символа совпадают, добавляем соответствующую выплату за этот символ
-            winnings += symbol_to_payout.get(spin_result[i], Decimal(0)) * bet_amount
 
-    # возвращаем общий выигрыш за этот спин
-    return winnings
+def calculate_rtp_to_precision(slot_machine, target_precision=0.05, confidence=0.99, min_spins=100000,
+                               max_spins=100000000, batch_size=DEFAULT_BATCH_SIZE, seed=None, workers=1,
+                               lines=None, min_hits=DEFAULT_MIN_HITS):
+    """
+    Рассчет RTP и волатильности с заданной точностью вместо фиксированного числа спинов.
+
+    Симуляция идет блоками и останавливается, как только доверительный интервал RTP
+    становится не шире rtp ± target_precision. Например, target_precision=0.05 и
+    confidence=0.99 означает "RTP ±0.05% с доверием 99%".
+
+    Параметры:
+    - slot_machine: объект SlotMachine, для которого будет проведен расчет.
+    - target_precision: допустимая полуширина интервала в процентных пунктах RTP.
+    - confidence: уровень доверия интервала (от 0 до 1).
+    - min_spins: минимальное количество спинов до первой проверки точности.
+    - max_spins: верхняя граница количества спинов.
+    - batch_size, seed, workers, lines: как в calculate_rtp_and_volatility.
+    - min_hits: минимальное количество выигрышных спинов, после которого точность
+      засчитывается (без выигрышей дисперсия нулевая и интервал вырожден).
+
+    return - словарь:
+    - rtp, volatility: как в calculate_rtp_and_volatility.
+    - spins: количество фактически просимулированных спинов.
+    - confidence_interval: достигнутый доверительный интервал RTP (нижняя и верхняя граница).
+    - converged: достигнута ли заданная точность до max_spins.
+    """
+    if target_precision <= 0:
+        raise ValueError("target_precision must be positive")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    if max_spins <= 0:
+        raise ValueError("max_spins must be positive")
+
+    _, sampler, evaluator = _prepare_simulation(slot_machine, lines)
+    z_score = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    # точность задана в процентах RTP, а симуляция считает выигрыш на единицу ставки
+    stats, converged = simulate_until_precision(
+        sampler, evaluator, target_precision / 100, z_score, min(min_spins, max_spins), max_spins,
+        batch_size=batch_size, seed=seed, workers=workers, min_hits=min_hits
+    )
+
+    rtp = stats.mean * 100
+    half_width = confidence_half_width(stats, z_score) * 100
+
+    return {
+        "rtp": rtp,
+        "volatility": stats.variance ** 0.5,
+        "spins": stats.count,
+        "confidence_interval": (rtp - half_width, rtp + half_width),
+        "converged": converged,
+    }
+
+
+def calculate_exact_rtp_and_volatility(slot_machine, lines=None):
+    """
+    Точный (аналитический) расчет RTP и волатильности игрового автомата
+    по его линиям выплат, без симуляции.
+
+    Параметры:
+    - slot_machine: объект SlotMachine, для которого будет проведен расчет.
+    - lines: количество линий выплат (по умолчанию - все доступные линии автомата);
+      линии берутся так же, как в get_paylines (кастомные или DEFAULT_PAYLINES).
+      В режиме "ways" все выигрыши считаются одной линией.
+      Для автоматов с лентами барабанов расчет - полный перебор комбинаций остановок,
+      для автоматов с таблицей исходов - взвешенная сумма по таблице.
+
+    return - словарь:
+    - rtp: процент возврата игроку при ставке 1 на каждую линию.
+    - volatility: стандартное отклонение выигрыша за спин на единицу общей ставки.
+    - expected_winning_lines: ожидаемое число выигрышных линий за спин (не hit_frequency
+      симуляции и солвера - доля спинов хотя бы с одним выигрышем).
+    - line_hit_frequency: вероятность выигрыша для каждой линии (по номеру линии).
+    - symbol_expected_winning_lines: ожидаемое число выигрышных линий за спин для каждого символа.
+    """
+    machine, sampler, evaluator = _prepare_simulation(slot_machine, lines)
+
+    if machine.reel_strips:
+        mean, variance, symbol_line_hits = exact_reel_moments(sampler, evaluator)
+    elif machine.lookup:
+        mean, variance, symbol_line_hits = exact_lookup_moments(sampler.probabilities, evaluator)
+    elif machine.evaluation_mode == SlotMachine.MODE_WAYS:
+        mean, variance, symbol_line_hits = exact_ways_moments(sampler.probabilities, evaluator)
+    else:
+        mean, variance, symbol_line_hits = exact_line_moments(sampler.probabilities, evaluator)
+
+    # общая ставка за спин равна количеству линий (ставка 1 на линию)
+    total_bet = evaluator.lines
+    line_hits = symbol_line_hits.sum(axis=1)
+    symbol_hits = symbol_line_hits.sum(axis=0)
+
+    return {
+        "rtp": mean / total_bet * 100,
+        "volatility": variance ** 0.5 / total_bet,
+        "expected_winning_lines": float(line_hits.sum()),
+        "line_hit_frequency": {
+            line_index + 1: float(hit) for line_index, hit in enumerate(line_hits)
+        },
+        "symbol_expected_winning_lines": {
+            name: float(hit) for name, hit in zip(machine.symbol_names, symbol_hits)
+        },
+    }
+
+
+def _simulate_payouts_python(machine, lines, total_spins, seed=None):
+    """
+    Эталонная поспиновая симуляция на чистом Python через calculate_winnings.
+    Возвращает RunningStats выигрышей за спин на единицу общей ставки (ставка 1 на линию).
+    """
+    generator = random.Random(seed)
+
+    stats = RunningStats()
+    for _ in range(total_spins):
+        columns = _grid_to_columns(machine, machine.grid_sampler.sample_grid(generator.random))
+        winnings, _ = calculate_winnings(columns, machine, lines, Decimal(1))
+        stats.push(float(winnings) / lines)
 
+    return stats
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GameSession
+
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+
+def idle_timeout():
+    """Время простоя, после которого открытая сессия закрывается (settings.GAME_SESSION_IDLE_TIMEOUT)."""
+    return timedelta(seconds=getattr(settings, 'GAME_SESSION_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT))
+
+
+def open_game_session(user, slot_machine, bet_amount, lines, now=None):
+    """
+    Возвращает открытую сессию игрока для автомата, ставки и количества линий
+    или открывает новую.
+
+    Открытая сессия, простоявшая дольше idle_timeout(), закрывается временем
+    последнего спина, и вместо нее открывается новая. Одновременные запросы
+    не создадут двух открытых сессий: это запрещает уникальное ограничение,
+    и проигравший запрос берет сессию, созданную первым.
+    """
+    now = now or timezone.now()
+    key = {
+        "user_id": user.pk,
+        "slot_machine_id": slot_machine.id,
+        "bet_amount": bet_amount,
+        "lines": lines,
+    }
+
+    session = GameSession.objects.filter(session_end__isnull=True, **key).first()
+    if session is not None:
+        if session.last_activity >= now - idle_timeout():
+            return session
+        GameSession.objects.filter(pk=session.pk, session_end__isnull=True).update(session_end=F('last_activity'))
+
+    try:
+        with transaction.atomic():
+            return GameSession.objects.create(session_start=now, last_activity=now, **key)
+    except IntegrityError:
+        return GameSession.objects.get(session_end__isnull=True, **key)
+
+
+def add_session_spins(session, wagered, winnings, spins=1, now=None):
+    """
+    Добавляет к итогам сессии spins спинов с общей ставкой wagered и выигрышем winnings
+    одним UPDATE с F()-инкрементами: конкурентные спины не теряют обновлений, а итоги
+    сессии никогда не пересчитываются агрегатами по Spin.
+    """
+    GameSession.objects.filter(pk=session.pk).update(
+        spin_count=F('spin_count') + spins,
+        total_wagered=F('total_wagered') + wagered,
+        total_winnings=F('total_winnings') + winnings,
+        last_activity=now or timezone.now(),
+    )
+
+
+def close_game_session(session, now=None):
+    """Явно закрывает сессию; возвращает False, если она уже была закрыта."""
+    now = now or timezone.now()
+    closed = GameSession.objects.filter(pk=session.pk, session_end__isnull=True).update(session_end=now)
+    if closed:
+        session.session_end = now
+    return bool(closed)
+
+
+def close_idle_game_sessions(now=None):
+    """
+    Закрывает все открытые сессии без спинов дольше idle_timeout() временем последнего спина.
+    Возвращает количество закрытых сессий.
+    """
+    cutoff = (now or timezone.now()) - idle_timeout()
+    return GameSession.objects.filter(session_end__isnull=True, last_activity__lt=cutoff).update(
+        session_end=F('last_activity')
+    )
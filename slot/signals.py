@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .compiled import create_symbol_table, invalidate_compiled_machine
+from .models import Payline, ReelStrip, SlotMachine, Symbol
+
+
+def _config_changed(slot_machine_id):
+    # версию меняем после коммита, иначе другой процесс может собрать автомат из старых данных
+    transaction.on_commit(lambda: invalidate_compiled_machine(slot_machine_id))
+    _schedule_after_commit(slot_machine_id)
+
+
+def _schedule_after_commit(slot_machine_id):
+    if not getattr(settings, 'RTP_REPORT_AUTO_SCHEDULE', True):
+        return
+
+    from .reports import schedule_rtp_report_for_machine_id
+
+    transaction.on_commit(lambda: schedule_rtp_report_for_machine_id(slot_machine_id))
+
+
+def _deleting_machine(origin):
+    # символы удаляются каскадом вместе с автоматом - таблица символов уже не нужна
+    return isinstance(origin, SlotMachine) or (isinstance(origin, QuerySet) and origin.model is SlotMachine)
+
+
+def _symbol_names_after(symbol, deleted=False):
+    """Имена символов автомата (в порядке id), какими они станут после сохранения или удаления symbol."""
+    names = dict(
+        Symbol.objects.filter(slot_machine_id=symbol.slot_machine_id).order_by('id').values_list('id', 'symbol_name')
+    )
+    if deleted:
+        names.pop(symbol.pk, None)
+    else:
+        # новый символ получит наибольший id и окажется последним
+        names[symbol.pk if symbol.pk in names else object()] = symbol.symbol_name
+    return list(names.values())
+
+
+# Таблица символов создается до записи изменения: процесс, увидевший новую конфигурацию,
+# уже найдет ее таблицу (compile_machine только читает таблицы).
+
+@receiver(pre_save, sender=SlotMachine)
+def slot_machine_saving(sender, instance, **kwargs):
+    if instance.pk is not None:
+        create_symbol_table(instance.pk, rows=instance.rows, cols=instance.cols)
+
+
+@receiver(pre_save, sender=Symbol)
+def symbol_saving(sender, instance, **kwargs):
+    create_symbol_table(instance.slot_machine_id, names=_symbol_names_after(instance))
+
+
+@receiver(pre_delete, sender=Symbol)
+def symbol_deleting(sender, instance, origin=None, **kwargs):
+    if not _deleting_machine(origin):
+        create_symbol_table(instance.slot_machine_id, names=_symbol_names_after(instance, deleted=True))
+
+
+@receiver(post_save, sender=SlotMachine)
+def slot_machine_saved(sender, instance, created=False, **kwargs):
+    if created:
+        create_symbol_table(instance.id)
+    _config_changed(instance.id)
+
+
+@receiver(post_delete, sender=SlotMachine)
+def slot_machine_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_compiled_machine(instance.id))
+
+
+@receiver([post_save, post_delete], sender=Symbol)
+@receiver([post_save, post_delete], sender=Payline)
+@receiver([post_save, post_delete], sender=ReelStrip)
+def machine_config_changed(sender, instance, **kwargs):
+    _config_changed(instance.slot_machine_id)
+
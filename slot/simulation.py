@@ -0,0 +1,211 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Сколько спинов генерируется за один векторизованный шаг. Блок держит
+# в памяти только (batch_size x rows*cols) индексов символов, поэтому
+# общее количество спинов ограничено лишь временем, а не памятью.
+DEFAULT_BATCH_SIZE = 65536
+
+# Сколько выигрышных спинов нужно, прежде чем доверять интервалу для среднего: пока
+# выигрышей нет или их единицы, выборочная дисперсия занижена (или равна нулю)
+DEFAULT_MIN_HITS = 100
+
+
+class RunningStats:
+    """
+    Потоковый аккумулятор среднего и дисперсии (Welford / Chan et al.).
+
+    Хранит только count, mean, m2 (сумму квадратов отклонений) и hits (количество
+    ненулевых значений, т.е. выигрышных спинов), поэтому память не растет с количеством
+    спинов, а аккумуляторы разных блоков и процессов можно объединять через merge.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'hits')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, hits=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.hits = hits
+
+    def push(self, value):
+        """Добавляет одно значение (алгоритм Уэлфорда)."""
+        self.count += 1
+        if value:
+            self.hits += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def push_batch(self, values):
+        """Добавляет массив значений, объединяя его статистику с накопленной."""
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        deviations = values - mean
+        self.merge(RunningStats(len(values), mean, float(np.dot(deviations, deviations)),
+                                int(np.count_nonzero(values))))
+
+    def merge(self, other):
+        """Объединяет статистику другого аккумулятора с текущей (формула Чана)."""
+        if other.count == 0:
+            return self
+        self.hits += other.hits
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        """Дисперсия генеральной совокупности (деление на count)."""
+        return self.m2 / self.count if self.count else 0.0
+
+
+def chunk_seed_sequence(entropy, chunk_index):
+    """
+    Независимый поток случайных чисел для блока chunk_index.
+
+    Поток зависит только от зерна и номера блока, а не от того, какой процесс
+    его считает, поэтому результат не зависит от количества процессов.
+    """
+    return np.random.SeedSequence(entropy, spawn_key=(chunk_index,))
+
+
+def simulate_chunks(sampler, evaluator, total_spins, batch_size, entropy, chunk_indices,
+                    accumulator=RunningStats):
+    """
+    Симулирует указанные блоки спинов и возвращает аккумулятор (по умолчанию RunningStats)
+    для каждого блока.
+    Блок chunk_index покрывает спины [chunk_index * batch_size, (chunk_index + 1) * batch_size).
+    """
+    results = []
+    for chunk_index in chunk_indices:
+        rng = np.random.default_rng(chunk_seed_sequence(entropy, chunk_index))
+        size = min(batch_size, total_spins - chunk_index * batch_size)
+        stats = accumulator()
+        stats.push_batch(evaluator.spin_returns(sampler.draw_grids(rng, size)))
+        results.append(stats)
+    return results
+
+
+def _simulate_chunk_range(executor, workers, sampler, evaluator, total_spins, batch_size, entropy, start, stop,
+                          accumulator=RunningStats):
+    """
+    Считает блоки [start, stop) - в текущем процессе или поровну между процессами пула.
+    Возвращает аккумуляторы блоков в порядке их номеров.
+    """
+    if executor is None:
+        return simulate_chunks(
+            sampler, evaluator, total_spins, batch_size, entropy, range(start, stop), accumulator
+        )
+
+    # каждому процессу - непрерывный диапазон блоков примерно одинакового размера
+    bounds = np.linspace(start, stop, workers + 1).astype(int)
+    futures = [
+        executor.submit(
+            simulate_chunks, sampler, evaluator, total_spins, batch_size,
+            entropy, range(chunk_start, chunk_stop), accumulator
+        )
+        for chunk_start, chunk_stop in zip(bounds[:-1], bounds[1:])
+        if chunk_stop > chunk_start
+    ]
+    return [stats for future in futures for stats in future.result()]
+
+
+def simulate_payouts(sampler, evaluator, total_spins, batch_size=DEFAULT_BATCH_SIZE, seed=None, workers=1,
+                     accumulator=RunningStats):
+    """
+    Симулирует total_spins спинов блоками по batch_size, при workers > 1 - в пуле процессов.
+
+    sampler - генератор сеток (CellGridSampler или ReelStripSampler), evaluator -
+    оценщик сеток (PaylineEvaluator или WaysEvaluator), его spin_returns дает
+    выигрыш на единицу общей ставки.
+
+    Возвращает аккумулятор выигрышей за спин на единицу ставки: RunningStats
+    или другой класс с тем же интерфейсом push_batch/merge. Для одного
+    и того же seed и batch_size результат одинаков при любом количестве процессов:
+    у каждого блока свой поток случайных чисел, а статистики блоков объединяются
+    в порядке номеров блоков.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    chunk_count = -(-total_spins // batch_size)
+    workers = max(1, min(workers, chunk_count))
+
+    if workers == 1:
+        chunk_stats = _simulate_chunk_range(
+            None, workers, sampler, evaluator, total_spins, batch_size, entropy, 0, chunk_count,
+            accumulator
+        )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_stats = _simulate_chunk_range(
+                executor, workers, sampler, evaluator, total_spins, batch_size, entropy, 0, chunk_count,
+                accumulator
+            )
+
+    total = accumulator()
+    for stats in chunk_stats:
+        total.merge(stats)
+    return total
+
+
+def confidence_half_width(stats, z_score):
+    """Полуширина доверительного интервала для среднего выигрыша за спин."""
+    if stats.count == 0:
+        return float('inf')
+    return z_score * (stats.variance / stats.count) ** 0.5
+
+
+def precision_reached(stats, target_half_width, z_score, min_hits=DEFAULT_MIN_HITS):
+    """
+    Достигнута ли точность: интервал не шире target_half_width, и ему можно доверять -
+    выигрышей не меньше min_hits и дисперсия ненулевая. Пока у редко выигрывающего
+    автомата не было выигрышей, дисперсия равна нулю и интервал вырождается в точку.
+    """
+    return (
+        stats.hits >= min_hits
+        and stats.variance > 0
+        and confidence_half_width(stats, z_score) <= target_half_width
+    )
+
+
+def simulate_until_precision(sampler, evaluator, target_half_width, z_score, min_spins, max_spins,
+                             batch_size=DEFAULT_BATCH_SIZE, seed=None, workers=1, min_hits=DEFAULT_MIN_HITS):
+    """
+    Симулирует блоками, пока полуширина доверительного интервала среднего выигрыша
+    за спин не станет не больше target_half_width (или пока не будет достигнут max_spins).
+    Точность не засчитывается, пока выигрышных спинов меньше min_hits (см. precision_reached).
+
+    Условие остановки проверяется после каждого блока в порядке номеров, поэтому
+    количество спинов и результат не зависят от количества процессов.
+
+    Возвращает RunningStats и флаг converged - достигнута ли заданная точность.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    chunk_count = -(-max_spins // batch_size)
+    workers = max(1, min(workers, chunk_count))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    total = RunningStats()
+    try:
+        next_chunk = 0
+        while next_chunk < chunk_count:
+            # за один раунд каждый процесс считает по одному блоку
+            stop = min(next_chunk + workers, chunk_count)
+            chunk_stats = _simulate_chunk_range(
+                executor, workers, sampler, evaluator, max_spins, batch_size, entropy, next_chunk, stop
+            )
+            for stats in chunk_stats:
+                total.merge(stats)
+                if total.count >= min_spins and precision_reached(total, target_half_width, z_score, min_hits):
+                    return total, True
+            next_chunk = stop
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return total, precision_reached(total, target_half_width, z_score, min_hits)
@@ -0,0 +1,229 @@
+import math
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .lookup import ENUMERATION_BATCH_SIZE, OutcomeTable
+from .models import Symbol
+
+# Предел количества сеток, которые перебираются при построении модели RTP
+MAX_SOLVER_OUTCOMES = 1 << 24
+
+DEFAULT_WEIGHT_RANGE = (1, 100)
+DEFAULT_MAX_ITERATIONS = 200
+DEFAULT_RESTARTS = 10
+
+# Шаги изменения веса и выплаты символа за один ход локального поиска
+WEIGHT_STEPS = (1, 2, 5, 10, 20, 50)
+PAYOUT_STEPS = (1, 2, 5)
+
+
+class RTPModel:
+    """
+    Точная модель выигрыша автомата как многочлена от вероятностей символов
+    (модель независимых ячеек).
+
+    Вероятность сетки зависит только от ее "состава" - сколько раз в ней встречается
+    каждый символ: P = prod(p_s ** n_s). Поэтому все сетки один раз перебираются и
+    группируются по составу, а для каждого состава хранятся суммы выигрышей символов
+    (W1), их попарных произведений (W2) и количество выигрышных сеток (H). После этого
+    RTP, дисперсия и частота выигрышей для любых весов - свертка по составам, а при
+    изменении выплаты символа выигрыши этого символа просто масштабируются.
+    """
+
+    def __init__(self, evaluator, symbols, cells, batch_size=ENUMERATION_BATCH_SIZE):
+        table = OutcomeTable(evaluator, symbols, cells, batch_size)
+        if table.outcomes > MAX_SOLVER_OUTCOMES:
+            raise ValueError(
+                f"Slot machine has {symbols}^{cells} outcomes, the RTP solver is limited to {MAX_SOLVER_OUTCOMES}"
+            )
+
+        self.symbols = symbols
+        self.cells = cells
+        self.lines = evaluator.lines
+
+        compositions = math.comb(cells + symbols - 1, symbols - 1)
+        self.counts = np.zeros((compositions, symbols))
+        self.win_sums = np.zeros((compositions, symbols))
+        self.win_products = np.zeros((compositions, symbols, symbols))
+        self.hits = np.zeros(compositions)
+
+        index = {}
+        key_powers = (cells + 1) ** np.arange(symbols, dtype=np.int64)
+        symbol_indices = np.arange(symbols)
+        for start in range(0, table.outcomes, batch_size):
+            grids = table.decode(np.arange(start, min(start + batch_size, table.outcomes)))
+            wins = evaluator.symbol_wins(grids)
+            counts = (grids[:, :, np.newaxis] == symbol_indices).sum(axis=1)
+
+            keys, first, inverse = np.unique(counts @ key_powers, return_index=True, return_inverse=True)
+            positions = np.array([index.setdefault(key, len(index)) for key in keys.tolist()])
+            self.counts[positions] = counts[first]
+            rows = positions[inverse.ravel()]
+
+            np.add.at(self.win_sums, rows, wins)
+            np.add.at(self.win_products, rows, wins[:, :, np.newaxis] * wins[:, np.newaxis, :])
+            np.add.at(self.hits, rows, wins.any(axis=1))
+
+    def log_probabilities(self, weights):
+        """Логарифм вероятности одной сетки каждого состава при весах символов weights."""
+        weights = np.asarray(weights, dtype=np.float64)
+        return self.counts @ np.log(weights) - self.cells * math.log(weights.sum())
+
+    def update_log_probabilities(self, log_probabilities, weights, symbol, weight):
+        """
+        Пересчет log_probabilities при изменении веса одного символа на weight:
+        меняются только вклад этого символа и нормировка, без пересчета по всем символам.
+        """
+        total = sum(weights)
+        return (
+            log_probabilities
+            + self.counts[:, symbol] * (math.log(weight) - math.log(weights[symbol]))
+            - self.cells * (math.log(total - weights[symbol] + weight) - math.log(total))
+        )
+
+    def moments(self, log_probabilities, scales):
+        """
+        RTP (в процентах), волатильность (на единицу общей ставки) и доля выигрышных
+        спинов, где scales - множители выплат символов относительно исходных.
+        """
+        probabilities = np.exp(log_probabilities)
+        mean = probabilities @ self.win_sums @ scales / 100
+        second_moment = scales @ np.tensordot(probabilities, self.win_products, axes=1) @ scales / 10000
+        variance = max(second_moment - mean ** 2, 0.0)
+        return (
+            mean / self.lines * 100,
+            variance ** 0.5 / self.lines,
+            float(probabilities @ self.hits),
+        )
+
+
+def _band_distance(value, low, high):
+    """Относительное расстояние от value до отрезка [low, high] (None - без границы)."""
+    if low is not None and value < low:
+        return (low - value) / low if low else low - value
+    if high is not None and value > high:
+        return (value - high) / high if high else value - high
+    return 0.0
+
+
+def solve_rtp(machine, target_rtp, volatility_range=(None, None), hit_frequency_range=(None, None),
+              tune_weights=True, tune_payouts=False, weight_range=DEFAULT_WEIGHT_RANGE, payout_step=Decimal(1),
+              candidates=5, restarts=DEFAULT_RESTARTS, max_iterations=DEFAULT_MAX_ITERATIONS, seed=None):
+    """
+    Подбор целых весов символов (symbol_count) и/или выплат символов (payout) под
+    целевой RTP, с необязательными границами волатильности и частоты выигрышей.
+
+    Поиск - локальный спуск с перезапусками: на каждом шаге пробуются изменения веса
+    или выплаты одного символа, и выбирается лучший ход. Каждая конфигурация считается
+    точно по RTPModel, при изменении одного веса вероятности пересчитываются инкрементально.
+    Первый запуск стартует с текущей конфигурации автомата, остальные - со случайных весов.
+
+    Выплаты подбираются только у символов с базовой выплатой больше нуля и без
+    payouts_by_length, с шагом payout_step.
+
+    return - список из candidates лучших конфигураций по возрастанию distance - суммы
+    относительных отклонений от целевого RTP и от границ волатильности и частоты выигрышей.
+    """
+    if machine.reel_strips:
+        raise ValueError("RTP solver does not support reel-strip machines, symbol weights are not used")
+    if not tune_weights and not tune_payouts:
+        raise ValueError("Nothing to tune: enable weights and/or payouts")
+    if target_rtp <= 0:
+        raise ValueError("target_rtp must be positive")
+
+    min_weight, max_weight = weight_range
+    if min_weight < 1 or max_weight < min_weight:
+        raise ValueError("Weight range must satisfy 1 <= min <= max")
+
+    evaluator = machine.evaluator.for_lines(machine.available_lines)
+    model = RTPModel(evaluator, len(machine.symbol_names), machine.rows * machine.cols)
+
+    base_payouts = machine.payouts
+    tunable_payouts = [
+        symbol for symbol in range(model.symbols)
+        if tune_payouts and base_payouts[symbol] > 0 and not machine.payouts_by_length[symbol]
+    ]
+    payout_step = Decimal(payout_step)
+
+    def distance(rtp, volatility, hit_frequency):
+        return (
+            abs(rtp - target_rtp) / target_rtp
+            + _band_distance(volatility, *volatility_range)
+            + _band_distance(hit_frequency, *hit_frequency_range)
+        )
+
+    evaluated = {}
+
+    def evaluate(weights, payouts, log_probabilities):
+        key = (weights, payouts)
+        if key not in evaluated:
+            scales = np.array([float(payout / base) if base else 1.0 for payout, base in zip(payouts, base_payouts)])
+            rtp, volatility, hit_frequency = model.moments(log_probabilities, scales)
+            evaluated[key] = (distance(rtp, volatility, hit_frequency), rtp, volatility, hit_frequency)
+        return evaluated[key][0]
+
+    def neighbours(weights, payouts, log_probabilities):
+        if tune_weights:
+            for symbol in range(model.symbols):
+                for step in WEIGHT_STEPS:
+                    for weight in (weights[symbol] - step, weights[symbol] + step):
+                        if min_weight <= weight <= max_weight:
+                            yield (
+                                weights[:symbol] + (weight,) + weights[symbol + 1:],
+                                payouts,
+                                model.update_log_probabilities(log_probabilities, weights, symbol, weight),
+                            )
+        for symbol in tunable_payouts:
+            for step in PAYOUT_STEPS:
+                for payout in (payouts[symbol] - step * payout_step, payouts[symbol] + step * payout_step):
+                    if payout >= payout_step:
+                        yield weights, payouts[:symbol] + (payout,) + payouts[symbol + 1:], log_probabilities
+
+    rng = np.random.default_rng(seed)
+    starts = [tuple(min(max(weight, min_weight), max_weight) for weight in machine.symbol_weights)]
+    if tune_weights:
+        starts += [
+            tuple(rng.integers(min_weight, max_weight + 1, size=model.symbols).tolist())
+            for _ in range(max(restarts - 1, 0))
+        ]
+
+    for weights in starts:
+        payouts = tuple(base_payouts)
+        log_probabilities = model.log_probabilities(weights)
+        current = evaluate(weights, payouts, log_probabilities)
+        for _ in range(max_iterations):
+            best = None
+            for candidate in neighbours(weights, payouts, log_probabilities):
+                score = evaluate(*candidate)
+                if score < current and (best is None or score < best[0]):
+                    best = (score, candidate)
+            if best is None:
+                break
+            current, (weights, payouts, log_probabilities) = best
+
+    ranked = sorted(evaluated.items(), key=lambda item: item[1][0])[:candidates]
+    return [
+        {
+            "weights": dict(zip(machine.symbol_names, weights)),
+            "payouts": dict(zip(machine.symbol_names, payouts)),
+            "rtp": float(rtp),
+            "volatility": float(volatility),
+            "hit_frequency": hit_frequency,
+            "distance": float(score),
+        }
+        for (weights, payouts), (score, rtp, volatility, hit_frequency) in ranked
+    ]
+
+
+def apply_candidate(slot_machine, candidate):
+    """
+    Записывает веса и выплаты конфигурации из solve_rtp в символы автомата
+    одной транзакцией (скомпилированный автомат и отчет RTP обновятся по сигналам).
+    """
+    with transaction.atomic():
+        for symbol in Symbol.objects.select_for_update().filter(slot_machine=slot_machine):
+            symbol.symbol_count = candidate["weights"][symbol.symbol_name]
+            symbol.payout = candidate["payouts"][symbol.symbol_name]
+            symbol.save(update_fields=['symbol_count', 'payout'])
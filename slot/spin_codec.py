@@ -0,0 +1,72 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+from .models import SymbolTable
+
+_symbol_tables = {}
+_symbol_tables_lock = threading.Lock()
+
+
+def grid_dtype(symbols):
+    """Тип ячейки компактной сетки: байт, если символов не больше 256, иначе два байта."""
+    return np.dtype('<u1') if symbols <= 256 else np.dtype('<u2')
+
+
+def encode_grid(grid, symbols):
+    """Упаковывает сетку индексов символов (построчно) в байты."""
+    return np.asarray(grid, dtype=grid_dtype(symbols)).tobytes()
+
+
+def decode_grid(data, symbol_table):
+    """Распаковывает компактную сетку в список колонок с именами символов."""
+    names = symbol_table.symbols
+    grid = np.frombuffer(bytes(data), dtype=grid_dtype(len(names))).tolist()
+    return [
+        [names[grid[row * symbol_table.cols + col]] for row in range(symbol_table.rows)]
+        for col in range(symbol_table.cols)
+    ]
+
+
+def symbol_table_digest(symbols, rows, cols):
+    """Ключ таблицы символов автомата: хеш списка имен и размеров сетки."""
+    payload = json.dumps([list(symbols), rows, cols], separators=(',', ':')).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_or_create_symbol_table(slot_machine_id, symbols, rows, cols):
+    """
+    Возвращает таблицу символов автомата для заданного списка имен и размеров сетки,
+    создавая ее при первом обращении. Таблицы не меняются, поэтому кешируются в процессе.
+    """
+    table, _ = SymbolTable.objects.get_or_create(
+        slot_machine_id=slot_machine_id,
+        digest=symbol_table_digest(symbols, rows, cols),
+        defaults={"rows": rows, "cols": cols, "symbols": list(symbols)},
+    )
+    with _symbol_tables_lock:
+        _symbol_tables[table.id] = table
+    return table
+
+
+def find_symbol_table(slot_machine_id, symbols, rows, cols):
+    """Как get_or_create_symbol_table, но только читает: None, если таблицы еще нет."""
+    table = SymbolTable.objects.filter(
+        slot_machine_id=slot_machine_id, digest=symbol_table_digest(symbols, rows, cols)
+    ).first()
+    if table is not None:
+        with _symbol_tables_lock:
+            _symbol_tables[table.id] = table
+    return table
+
+
+def get_symbol_table(symbol_table_id):
+    """Таблица символов по id из кеша процесса (один запрос к базе на таблицу)."""
+    table = _symbol_tables.get(symbol_table_id)
+    if table is None:
+        table = SymbolTable.objects.get(id=symbol_table_id)
+        with _symbol_tables_lock:
+            _symbol_tables[symbol_table_id] = table
+    return table
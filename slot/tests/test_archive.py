@@ -0,0 +1,50 @@
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import Role, User
+from config.constants import DEFAULT_ROLES
+from slot.archive import KIND_SPINS, archive_history, read_archived_history
+from slot.models import GameSession, SlotMachine, Spin
+from slot.rollups import machine_stats, update_hourly_stats
+
+
+@override_settings(RTP_REPORT_AUTO_SCHEDULE=False, COMPILED_MACHINE_VERSION_TTL=0)
+class ArchiveRollupTests(TestCase):
+    def setUp(self):
+        for name, role_id in DEFAULT_ROLES.items():
+            Role.objects.get_or_create(id=role_id, defaults={"name": name})
+        self.user = User.objects.create_user("player@example.com", password="secret", phone="1")
+        self.machine = SlotMachine.objects.create(
+            name="Test", rows=1, cols=1, max_lines=1, min_bet=Decimal('0.10'), max_bet=Decimal('10.00')
+        )
+        session = GameSession.objects.create(
+            user=self.user, slot_machine=self.machine, bet_amount=Decimal('1.00'), lines=1
+        )
+        spin_time = timezone.now() - timedelta(days=3)
+        for winnings in ("0.00", "2.00", "0.00"):
+            Spin.objects.create(game_session=session, spin_result=[["Apple"]], winnings=Decimal(winnings), spin_time=spin_time)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.cutoff = timezone.now() - timedelta(days=1)
+
+    def test_spins_are_archived_only_after_the_rollup_counts_them(self):
+        self.assertEqual(archive_history(KIND_SPINS, self.cutoff, root=self.root), 0)
+        self.assertEqual(Spin.objects.count(), 3)
+
+        self.assertEqual(update_hourly_stats(), 3)
+        self.assertEqual(archive_history(KIND_SPINS, self.cutoff, root=self.root), 3)
+        self.assertFalse(Spin.objects.exists())
+        self.assertEqual(len(read_archived_history(KIND_SPINS, self.user.id, root=self.root)), 3)
+
+        self.assertEqual(update_hourly_stats(), 0)
+        stats = machine_stats(self.machine.id)
+        self.assertEqual(stats["spin_count"], 3)
+        self.assertEqual(stats["winning_spins"], 1)
+        self.assertEqual(stats["handle"], Decimal('3.00'))
+        self.assertEqual(stats["total_winnings"], Decimal('2.00'))
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models.signals import pre_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from slot.compiled import get_compiled_machine
+from slot.models import SlotMachine, Symbol, SymbolTable
+from slot.spin_codec import find_symbol_table
+
+
+@override_settings(RTP_REPORT_AUTO_SCHEDULE=False, COMPILED_MACHINE_VERSION_TTL=0)
+class CompiledMachineTests(TestCase):
+    def setUp(self):
+        self.machine = SlotMachine.objects.create(
+            name="Test", rows=3, cols=3, max_lines=5, min_bet=Decimal('0.10'), max_bet=Decimal('10.00')
+        )
+        for name in ("Apple", "Banana"):
+            Symbol.objects.create(slot_machine=self.machine, symbol_name=name, symbol_count=1, payout=Decimal(2))
+
+    def test_symbol_table_is_created_when_the_machine_changes(self):
+        table = SymbolTable.objects.get(id=get_compiled_machine(self.machine.id).symbol_table_id)
+        self.assertEqual(table.symbols, ["Apple", "Banana"])
+
+        # the compiled machine version is replaced after commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Symbol.objects.create(slot_machine=self.machine, symbol_name="Citrus", symbol_count=1, payout=Decimal(3))
+        table = SymbolTable.objects.get(id=get_compiled_machine(self.machine.id).symbol_table_id)
+        self.assertEqual(table.symbols, ["Apple", "Banana", "Citrus"])
+
+    def test_symbol_table_exists_before_the_change_is_written(self):
+        # outside a transaction another process sees the symbol row as soon as it is written
+        tables = []
+
+        def symbol_saving(sender, instance, **kwargs):
+            tables.append(find_symbol_table(self.machine.id, ["Apple", "Banana", "Citrus"], 3, 3))
+
+        pre_save.connect(symbol_saving, sender=Symbol)
+        self.addCleanup(pre_save.disconnect, symbol_saving, sender=Symbol)
+        Symbol.objects.create(slot_machine=self.machine, symbol_name="Citrus", symbol_count=1, payout=Decimal(3))
+        self.assertIsNotNone(tables[0])
+
+        self.machine.rows = 4
+        with self.captureOnCommitCallbacks(execute=True):
+            self.machine.save()
+        self.assertEqual(get_compiled_machine(self.machine.id).rows, 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Symbol.objects.get(symbol_name="Banana").delete()
+        table = SymbolTable.objects.get(id=get_compiled_machine(self.machine.id).symbol_table_id)
+        self.assertEqual(table.symbols, ["Apple", "Citrus"])
+
+    def test_compiling_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_compiled_machine(self.machine.id)
+        self.assertTrue(queries.captured_queries)
+        self.assertTrue(all(query['sql'].lstrip().upper().startswith('SELECT') for query in queries.captured_queries))
+
+    def test_deleting_the_machine_deletes_its_symbols(self):
+        self.machine.delete()
+        self.assertFalse(SymbolTable.objects.exists())
+        self.assertFalse(Symbol.objects.exists())
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from slot.models import SlotMachine, Symbol
+from slot.services import calculate_rtp_to_precision
+
+
+# machine ids are reused after each test's rollback: check the compiled machine version on every lookup
+@override_settings(RTP_REPORT_AUTO_SCHEDULE=False, COMPILED_MACHINE_VERSION_TTL=0)
+class RTPToPrecisionTests(TestCase):
+    def create_machine(self, symbols):
+        machine = SlotMachine.objects.create(
+            name="Test", rows=3, cols=3, max_lines=5, min_bet=Decimal('0.10'), max_bet=Decimal('10.00')
+        )
+        for name, count, payout in symbols:
+            Symbol.objects.create(slot_machine=machine, symbol_name=name, symbol_count=count, payout=Decimal(payout))
+        return machine
+
+    def test_low_hit_machine_does_not_converge_without_wins(self):
+        # jackpot line has probability ~1e-9: no simulated spin wins, the sample variance is 0
+        machine = self.create_machine([("Blank", 1000, 0), ("Jackpot", 1, 1000)])
+
+        result = calculate_rtp_to_precision(
+            machine, target_precision=0.05, min_spins=1000, max_spins=20000, batch_size=1000, seed=1
+        )
+
+        self.assertFalse(result["converged"])
+        self.assertEqual(result["spins"], 20000)
+
+    def test_converges_once_enough_spins_win(self):
+        machine = self.create_machine([("Apple", 1, 2), ("Banana", 1, 3)])
+
+        result = calculate_rtp_to_precision(
+            machine, target_precision=5, min_spins=1000, max_spins=200000, batch_size=1000, seed=1
+        )
+
+        self.assertTrue(result["converged"])
+        self.assertLess(result["spins"], 200000)
+        low, high = result["confidence_interval"]
+        self.assertLess(low, high)
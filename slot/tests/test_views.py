@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from authentication.models import Role, Transaction, User
+from authentication.serializers import GameTokenObtainPairSerializer
+from config.constants import DEFAULT_ROLES
+from slot.models import SlotMachine, Symbol
+
+
+@override_settings(RTP_REPORT_AUTO_SCHEDULE=False, COMPILED_MACHINE_VERSION_TTL=0)
+class GameEndpointTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name, role_id in DEFAULT_ROLES.items():
+            Role.objects.get_or_create(id=role_id, defaults={"name": name})
+        cls.user = User.objects.create_user("player@example.com", password="secret", phone="1", balance=Decimal('100'))
+        cls.machine = SlotMachine.objects.create(
+            name="Test", rows=3, cols=3, max_lines=5, min_bet=Decimal('0.10'), max_bet=Decimal('10.00')
+        )
+        for name, count, payout in (("Apple", 1, 2), ("Banana", 2, 3)):
+            Symbol.objects.create(slot_machine=cls.machine, symbol_name=name, symbol_count=count, payout=Decimal(payout))
+
+    def setUp(self):
+        self.client = APIClient()
+        token = GameTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+class MoneyFormatTests(GameEndpointTestCase):
+    def test_money_fields_are_decimal_strings(self):
+        spin = self.client.post(
+            '/slot/spin/', {"slot_machine_id": self.machine.id, "bet_amount": "1.00", "lines": 1}, format='json'
+        ).json()
+        autoplay = self.client.post(
+            '/slot/autoplay/', {"slot_machine_id": self.machine.id, "bet_amount": "1.00", "lines": 1, "spins": 3},
+            format='json',
+        ).json()
+        balance = self.client.get('/slot/balance/').json()
+        deposit = self.client.post('/slot/deposit/', {"amount": "5"}, format='json').json()
+
+        money = [
+            spin["balance"], spin["spin_result"]["winnings"], balance["balance"], deposit["current_balance"],
+            autoplay["total_bet"], autoplay["total_winnings"], autoplay["balance"],
+            *(winnings for _, winnings, _ in autoplay["results"]),
+        ]
+        for value in money:
+            self.assertIsInstance(value, str)
+            self.assertRegex(value, r'^\d+\.\d{2}$')
+        self.assertEqual(autoplay["total_bet"], "3.00")
+
+
+class DepositTests(GameEndpointTestCase):
+    def test_invalid_amounts_are_rejected(self):
+        for amount in ("abc", "NaN", "Infinity", "1e20", "0.001", 0.001, "0", "-5", None, True):
+            with self.subTest(amount=amount):
+                response = self.client.post('/slot/deposit/', {"amount": amount}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Transaction.objects.filter(user=self.user, transaction_type='DEPOSIT').exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('100.00'))
+
+    def test_deposit(self):
+        response = self.client.post('/slot/deposit/', {"amount": 0.1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["current_balance"], "100.10")
+        entry = Transaction.objects.get(user=self.user, transaction_type='DEPOSIT')
+        self.assertEqual(entry.amount, Decimal('0.10'))
+
+
+class AnonymousAccessTests(GameEndpointTestCase):
+    def test_game_endpoints_require_a_token(self):
+        client = APIClient()
+        bet = {"slot_machine_id": self.machine.id, "bet_amount": "1.00", "lines": 1}
+        responses = {
+            "spin": client.post('/slot/spin/', bet, format='json'),
+            "autoplay": client.post('/slot/autoplay/', {**bet, "spins": 3}, format='json'),
+            "balance": client.get('/slot/balance/'),
+            "deposit": client.post('/slot/deposit/', {"amount": "5"}, format='json'),
+        }
+        for endpoint, response in responses.items():
+            with self.subTest(endpoint=endpoint):
+                self.assertEqual(response.status_code, 401)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.balance, Decimal('100.00'))
@@ -1,8 +1,28 @@
 from django.urls import path
-from .views import SlotMachineSpinView, PlayerBalanceView, DepositView
+from . import async_views
+from .views import (
+    SlotMachineSpinView, AutoplayView, ArchivedHistoryView, PlayerBalanceView, DepositView, RTPVolatilityView, RTPReportJobView, RTPSolverView,
+    TransactionHistoryView, GameSessionHistoryView, SessionSpinHistoryView,
+    CloseGameSessionView, MachineStatsView, HistoryExportView,
+)
 
 urlpatterns = [
     path('balance/', PlayerBalanceView.as_view(), name='player-balance'),
     path('deposit/', DepositView.as_view(), name='deposit'),
     path('spin/', SlotMachineSpinView.as_view(), name='slot-machine-spin'),
+    # async (ASGI) variants of the hot endpoints
+    path('async/balance/', async_views.balance, name='async-player-balance'),
+    path('async/deposit/', async_views.deposit, name='async-deposit'),
+    path('async/spin/', async_views.spin, name='async-slot-machine-spin'),
+    path('autoplay/', AutoplayView.as_view(), name='slot-machine-autoplay'),
+    path('machines/<int:slot_machine_id>/rtp/', RTPVolatilityView.as_view(), name='slot-machine-rtp'),
+    path('machines/<int:slot_machine_id>/stats/', MachineStatsView.as_view(), name='slot-machine-stats'),
+    path('machines/<int:slot_machine_id>/rtp-solver/', RTPSolverView.as_view(), name='slot-machine-rtp-solver'),
+    path('sessions/<int:session_id>/close/', CloseGameSessionView.as_view(), name='close-game-session'),
+    path('history/transactions/', TransactionHistoryView.as_view(), name='transaction-history'),
+    path('history/sessions/', GameSessionHistoryView.as_view(), name='game-session-history'),
+    path('history/sessions/<int:session_id>/spins/', SessionSpinHistoryView.as_view(), name='session-spin-history'),
+    path('history/export/<str:kind>/', HistoryExportView.as_view(), name='history-export'),
+    path('history/archive/<str:kind>/', ArchivedHistoryView.as_view(), name='archived-history'),
+    path('rtp-jobs/<int:job_id>/', RTPReportJobView.as_view(), name='rtp-report-job'),
 ]
@@ -1,24 +1,47 @@
 from rest_framework import status
-from decimal import Decimal
+from datetime import timezone as dt_timezone
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from slot.models import SlotMachine
-from slot.serializers import BetSerializer, SpinResultSerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from slot.models import GameSession, SlotMachine, RTPReport, Spin
+from slot.pagination import KeysetPagination
+from slot.serializers import (
+    AutoplaySerializer,
+    BetSerializer,
+    GameSessionHistorySerializer,
+    RTPSolverSerializer,
+    SpinHistorySerializer,
+    TransactionHistorySerializer,
+    money_data,
+    spin_result_data,
+)
 from slot.services import (
-    create_game_session, 
-    generate_spin, 
-    calculate_winnings, 
-    record_spin, 
-    create_bet_transaction, 
-    create_win_transaction,
-    calculate_rtp_and_volatility
+    bet_error,
+    play_spin,
+    play_autoplay
 )
-from slot.services import DEFAULT_PAYLINES
+from slot.sessions import close_game_session
+from slot.reports import get_latest_report, schedule_rtp_report
+from slot.rollups import machine_stats, stats_updated_at
+from slot.compiled import get_compiled_machine
+from slot.solver import solve_rtp
+from slot.archive import KINDS, read_archived_history
+from slot.exports import CONTENT_TYPES, FORMAT_NDJSON, FORMATS, export_filename, export_history
+from authentication.authentication import GameTokenAuthentication
+from shared.django.renderers import CompactJSONRenderer, FastJSONRenderer
 from authentication.models import Transaction
+from authentication.wallet import InsufficientFunds, InvalidAmount, credit, parse_deposit_amount
 
 
 class SlotMachineSpinView(APIView):
+    authentication_classes = [GameTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, CompactJSONRenderer]
+
     def post(self, request):
         user = request.user
         serializer = BetSerializer(data=request.data)
@@ -28,86 +51,310 @@ class SlotMachineSpinView(APIView):
             bet_amount = serializer.validated_data['bet_amount']
             lines = serializer.validated_data['lines']
             
-            # Validate slot machine and bet
-            slot_machine = get_object_or_404(SlotMachine, id=slot_machine_id)
+            # Validate slot machine and bet (compiled machine is cached per process, no queries in steady state)
+            slot_machine = get_compiled_machine(slot_machine_id)
+            error = bet_error(slot_machine, bet_amount, lines)
+            if error:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
             
-            if bet_amount * lines > user.balance:
+            # Debit, spin, winnings and session totals in one transaction
+            try:
+                spin_instance, winning_lines, session = play_spin(user, slot_machine, bet_amount, lines)
+            except InsufficientFunds:
                 return Response({"error": "Insufficient funds"}, status=status.HTTP_400_BAD_REQUEST)
             
-            if bet_amount < slot_machine.min_bet or bet_amount > slot_machine.max_bet:
-                return Response({"error": f"Bet must be between {slot_machine.min_bet} and {slot_machine.max_bet}"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            if lines > len(DEFAULT_PAYLINES) or lines < 1:
-                return Response({"error": f"Invalid number of lines, max is {len(DEFAULT_PAYLINES)}"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Deduct balance and create a game session
-            total_bet = bet_amount * lines
-            create_bet_transaction(user, total_bet)
-            
-            session = create_game_session(user, slot_machine, bet_amount, lines)
-            
-            # Perform spin
-            spin_result = generate_spin(slot_machine)
-            
-            # Calculate winnings
-            winnings, winning_lines = calculate_winnings(spin_result, slot_machine, lines, bet_amount)
-            
-            # Record the spin and update balance
-            spin_instance = record_spin(session, spin_result, winnings)
-            
-            # If the user won, create a win transaction
-            if winnings > 0:
-                create_win_transaction(user, winnings)
-            
-            # Serialize the spin result using SpinResultSerializer
-            spin_serializer = SpinResultSerializer(spin_instance)
-            
+            # Same payload as SpinResultSerializer, built without DRF field machinery
             return Response({
-                "spin_result": spin_serializer.data,
+                "spin_result": spin_result_data(spin_instance),
                 "winning_lines": winning_lines,
-                "balance": user.balance
+                "session_id": session.id,
+                "balance": money_data(user.balance)
             }, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AutoplayView(APIView):
+    authentication_classes = [GameTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, CompactJSONRenderer]
+
+    def post(self, request):
+        user = request.user
+        serializer = AutoplaySerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        bet_amount = data['bet_amount']
+        lines = data['lines']
+        slot_machine = get_compiled_machine(data['slot_machine_id'])
+        
+        error = bet_error(slot_machine, bet_amount, lines)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # All spins of the batch run in one DB transaction with bulk inserts
+        autoplay = play_autoplay(
+            user, slot_machine, bet_amount, lines, data['spins'],
+            stop_loss=data['stop_loss'], stop_win=data['stop_win']
+        )
+        
+        if autoplay['spins_played'] == 0:
+            return Response({"error": "Insufficient funds"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Compact per-spin arrays: [grid of symbol indices (row-major), winnings, winning lines].
+        # Money fields are decimal strings (money_data), as in every game endpoint
+        return Response({
+            "symbols": slot_machine.symbol_names,
+            "results": [[grid, money_data(winnings), winning_lines] for grid, winnings, winning_lines in autoplay['results']],
+            "spins_played": autoplay['spins_played'],
+            "total_bet": money_data(autoplay['total_bet']),
+            "total_winnings": money_data(autoplay['total_winnings']),
+            "stop_reason": autoplay['stop_reason'],
+            "balance": money_data(autoplay['balance'])
+        }, status=status.HTTP_200_OK)
+
+
 class RTPVolatilityView(APIView):
     def get(self, request, slot_machine_id):
         slot_machine = get_object_or_404(SlotMachine, id=slot_machine_id)
         
-        rtp, volatility = calculate_rtp_and_volatility(slot_machine)
+        # Serve the stored report for the current configuration, or queue its computation
+        report = schedule_rtp_report(slot_machine)
+        
+        if report.status != RTPReport.STATUS_DONE:
+            return Response({
+                "job_id": report.id,
+                "status": report.status
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        return Response({
+            "rtp": report.rtp,
+            "volatility": report.volatility,
+            "total_spins": report.total_spins,
+            "distribution": report.details,
+            "computed_at": report.finished_at
+        }, status=status.HTTP_200_OK)
+
+
+class RTPReportJobView(APIView):
+    def get(self, request, job_id):
+        report = get_object_or_404(RTPReport, id=job_id)
+        
+        return Response({
+            "job_id": report.id,
+            "slot_machine_id": report.slot_machine_id,
+            "status": report.status,
+            "rtp": report.rtp,
+            "volatility": report.volatility,
+            "total_spins": report.total_spins,
+            "distribution": report.details,
+            "error": report.error,
+            "computed_at": report.finished_at
+        }, status=status.HTTP_200_OK)
+
+
+class RTPSolverView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, slot_machine_id):
+        serializer = RTPSolverSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        try:
+            candidates = solve_rtp(
+                get_compiled_machine(slot_machine_id),
+                data['target_rtp'],
+                volatility_range=(data['min_volatility'], data['max_volatility']),
+                hit_frequency_range=(data['min_hit_frequency'], data['max_hit_frequency']),
+                tune_weights=data['tune_weights'],
+                tune_payouts=data['tune_payouts'],
+                weight_range=(data['min_weight'], data['max_weight']),
+                payout_step=data['payout_step'],
+                candidates=data['candidates'],
+                seed=data['seed'],
+            )
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({"candidates": candidates}, status=status.HTTP_200_OK)
+
+
+def parse_time_range(request):
+    """
+    Reads the optional 'from' and 'to' ISO 8601 query parameters (naive values are UTC).
+    Returns (bounds, None) or (None, error response).
+    """
+    bounds = {}
+    for param in ('from', 'to'):
+        value = request.query_params.get(param)
+        bounds[param] = parse_datetime(value) if value else None
+        if value and bounds[param] is None:
+            return None, Response({"error": f"'{param}' must be an ISO 8601 datetime"}, status=status.HTTP_400_BAD_REQUEST)
+        if bounds[param] is not None and timezone.is_naive(bounds[param]):
+            bounds[param] = timezone.make_aware(bounds[param], dt_timezone.utc)
+    return bounds, None
+
+
+class MachineStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, slot_machine_id):
+        slot_machine = get_object_or_404(SlotMachine, id=slot_machine_id)
+        
+        bounds, error = parse_time_range(request)
+        if error:
+            return error
+        
+        # Sums over the hourly rollup rows, never over Spin
+        stats = machine_stats(slot_machine.id, start=bounds['from'], end=bounds['to'],
+                              hourly=request.query_params.get('hourly') in ('1', 'true'))
+        report = get_latest_report(slot_machine)
         
         return Response({
-            "rtp": rtp,
-            "volatility": volatility
+            "slot_machine_id": slot_machine.id,
+            **stats,
+            "theoretical_rtp": report.rtp if report else None,
+            "updated_at": stats_updated_at(),
         }, status=status.HTTP_200_OK)
 
 
+class ArchivedHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+    MAX_LIMIT = 1000
+
+    def get(self, request, kind):
+        if kind not in KINDS:
+            return Response({"error": f"Unknown history kind, expected one of {', '.join(KINDS)}"}, status=status.HTTP_404_NOT_FOUND)
+        
+        bounds, error = parse_time_range(request)
+        if error:
+            return error
+        
+        try:
+            limit = min(int(request.query_params.get('limit', self.MAX_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Read straight from the archive segments, nothing is restored into the database
+        rows = read_archived_history(kind, request.user.id, start=bounds['from'], end=bounds['to'], limit=limit)
+        return Response({"results": rows}, status=status.HTTP_200_OK)
+
+
+class KeysetHistoryView(APIView):
+    """Base for history endpoints paginated newest-first by (time, id)."""
+    permission_classes = [IsAuthenticated]
+    time_field = None
+    serializer_class = None
+
+    def get_queryset(self, request, **kwargs):
+        raise NotImplementedError
+
+    def get(self, request, **kwargs):
+        paginator = KeysetPagination(self.time_field)
+        page = paginator.paginate_queryset(self.get_queryset(request, **kwargs), request, view=self)
+        return paginator.get_paginated_response(self.serializer_class(page, many=True).data)
+
+
+class TransactionHistoryView(KeysetHistoryView):
+    time_field = 'created_at'
+    serializer_class = TransactionHistorySerializer
+
+    def get_queryset(self, request):
+        return Transaction.objects.filter(user=request.user)
+
+
+class GameSessionHistoryView(KeysetHistoryView):
+    time_field = 'session_start'
+    serializer_class = GameSessionHistorySerializer
+
+    def get_queryset(self, request):
+        return GameSession.objects.filter(user=request.user)
+
+
+class SessionSpinHistoryView(KeysetHistoryView):
+    time_field = 'spin_time'
+    serializer_class = SpinHistorySerializer
+
+    def get_queryset(self, request, session_id):
+        session = get_object_or_404(GameSession.objects.only('id'), id=session_id, user=request.user)
+        return Spin.objects.filter(game_session=session)
+
+
+class CloseGameSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        session = get_object_or_404(GameSession, id=session_id, user=request.user)
+        close_game_session(session)
+        return Response(GameSessionHistorySerializer(session).data, status=status.HTTP_200_OK)
+
+
+class HistoryExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind):
+        if kind not in KINDS:
+            return Response({"error": f"Unknown history kind, expected one of {', '.join(KINDS)}"}, status=status.HTTP_404_NOT_FOUND)
+        
+        # not 'format': DRF reserves that query parameter for renderer negotiation
+        export_format = request.query_params.get('output', FORMAT_NDJSON)
+        if export_format not in FORMATS:
+            return Response({"error": f"Unknown output format, expected one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        bounds, error = parse_time_range(request)
+        if error:
+            return error
+        
+        # Players export their own history; staff may pass another user_id, or user_id=all for everyone in the range
+        user_id = request.user.id
+        all_users = False
+        if request.user.is_staff and 'user_id' in request.query_params:
+            if request.query_params['user_id'] == 'all':
+                user_id, all_users = None, True
+            else:
+                try:
+                    user_id = int(request.query_params['user_id'])
+                except ValueError:
+                    return Response({"error": "'user_id' must be an integer or 'all'"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        # Rows are read with a database cursor and encoded while the response is being sent
+        response = StreamingHttpResponse(
+            export_history(kind, export_format, user_id=user_id, all_users=all_users,
+                           start=bounds['from'], end=bounds['to'], compress=compress),
+            content_type='application/gzip' if compress else CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, export_format, compress)}"'
+        return response
+
+
 class PlayerBalanceView(APIView):
+    authentication_classes = [GameTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, CompactJSONRenderer]
+
     def get(self, request):
         user = request.user
-        return Response({"balance": user.balance}, status=status.HTTP_200_OK)
+        return Response({"balance": money_data(user.balance)}, status=status.HTTP_200_OK)
 
 
 class DepositView(APIView):
+    authentication_classes = [GameTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
         user = request.user
         try:
-            amount = Decimal(request.data.get("amount", 0))
-            if amount <= 0:
-                return Response({"error": "Deposit amount must be greater than zero"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            user.balance += amount
-            user.save()
-
-            Transaction.objects.create(
-                user=user,
-                transaction_type='DEPOSIT',
-                amount=amount,
-                balance_after=user.balance
-            )
-            
-            return Response({"message": "Deposit successful", "current_balance": user.balance}, status=status.HTTP_200_OK)
-        
-        except (TypeError, ValueError):
-            return Response({"error": "Invalid amount format"}, status=status.HTTP_400_BAD_REQUEST)
+            amount = parse_deposit_amount(request.data.get("amount", 0))
+        except InvalidAmount as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Single-statement balance increment plus ledger row in one transaction
+        credit(user, amount, 'DEPOSIT')
+
+        return Response({"message": "Deposit successful", "current_balance": money_data(user.balance)}, status=status.HTTP_200_OK)
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+import numpy as np
+
+
+def build_ways_pay_table(cols, payouts, payouts_by_length):
+    """
+    Таблица выплат режима "ways" в центах: pay_table[symbol, run] - выплата за один
+    способ (way) серии символа symbol на первых run барабанах, в долях общей ставки.
+
+    Как и для линий, payouts_by_length задает выплаты за "3/4/5 в ряд", а без него
+    символ платит payout только за серию на всех барабанах.
+    """
+    pay_table = np.zeros((len(payouts), cols + 1), dtype=np.int64)
+    for symbol_index, (payout, by_length) in enumerate(zip(payouts, payouts_by_length)):
+        if by_length:
+            for run, run_payout in by_length.items():
+                if 0 < int(run) <= cols:
+                    pay_table[symbol_index, int(run)] = round(Decimal(str(run_payout)) * 100)
+        else:
+            pay_table[symbol_index, cols] = round(payout * 100)
+    return pay_table
+
+
+class WaysEvaluator:
+    """
+    Оценщик режима "ways to win" (243/1024 способа и т.п.).
+
+    Символ выигрывает, если он есть на первых run барабанах (колонках) подряд слева
+    направо, где бы он ни стоял на барабане. Количество способов - произведение
+    количества этого символа на каждом из этих барабанов. Вместо перебора всех
+    rows^cols способов строится матрица "символ x барабан" с количествами, поэтому
+    оценка стоит O(барабаны x символы).
+
+    Интерфейс совпадает с PaylineEvaluator: все выигрыши режима считаются одной
+    "линией" со ставкой, равной общей ставке спина; score возвращает выигрыш по
+    каждому символу.
+    """
+
+    lines = 1
+
+    def __init__(self, rows, cols, pay_table):
+        self.rows = rows
+        self.cols = cols
+        self.pay_table = pay_table
+        self.symbol_indices = np.arange(pay_table.shape[0])
+        self.pay_table.setflags(write=False)
+
+    @classmethod
+    def from_config(cls, rows, cols, payouts, payouts_by_length):
+        return cls(rows, cols, build_ways_pay_table(cols, payouts, payouts_by_length))
+
+    def for_lines(self, lines):
+        return self
+
+    def reel_counts(self, grids):
+        """Количество каждого символа на каждом барабане - массив (N x символы x барабаны)."""
+        reels = grids.reshape(len(grids), self.rows, self.cols)
+        return (reels[:, np.newaxis, :, :] == self.symbol_indices[np.newaxis, :, np.newaxis, np.newaxis]).sum(axis=2)
+
+    def symbol_wins(self, grids):
+        """Выигрыш каждого символа в центах на единицу общей ставки - массив (N x символы)."""
+        counts = self.reel_counts(grids)
+        runs = np.cumprod(counts > 0, axis=2).sum(axis=2)
+
+        # ways[k - 1] - количество способов для серии длины k
+        ways = np.cumprod(counts, axis=2)
+        run_ways = np.take_along_axis(ways, np.maximum(runs - 1, 0)[:, :, np.newaxis], axis=2)[:, :, 0]
+        return np.where(runs > 0, run_ways, 0) * self.pay_table[self.symbol_indices, runs]
+
+    # выигрыши символов играют роль выигрышей линий (как в PaylineEvaluator.line_wins)
+    line_wins = symbol_wins
+
+    def win_counts(self, grids, weights=None):
+        """
+        Количество выигрышей каждого символа в блоке сеток - массив (1 x символы).
+        Если заданы weights, каждая сетка считается с весом weights[i].
+        """
+        won = self.symbol_wins(grids) > 0
+        if weights is not None:
+            won = won * weights[:, np.newaxis]
+        return won.sum(axis=0)[np.newaxis, :]
+
+    def score(self, grid):
+        """Выигрыш каждого символа в центах для одной сетки."""
+        return self.symbol_wins(np.asarray(grid)[np.newaxis, :])[0]
+
+    def score_batch(self, grids):
+        """Суммарный выигрыш в центах для каждой сетки блока."""
+        return self.symbol_wins(grids).sum(axis=1)
+
+    def spin_returns(self, grids):
+        """Выигрыш каждой сетки блока на единицу общей ставки."""
+        return self.score_batch(grids) / 100